@@ -1,24 +1,18 @@
 import streamlit as st
-import pandas as pd
-import altair as alt
 
-# Step 1: Load the data and clean it
-@st.cache_data
-def load_data():
-    df = pd.read_csv("gdp_year_with_more.csv")  # Adjust the path as needed
+import aggregates
+import backends
+import bootstrap
+import charts
+import memo
+import streaming
+import term_metrics
+import timing
+import watcher
 
-    # Remove commas and dollar signs, then convert to numeric, handling missing values
-    df['GDP'] = df['GDP'].replace({'\$': '', ',': ''}, regex=True).astype(float).fillna(0)
-    df['Growth'] = df['Growth'].replace({'\$': '', ',': ''}, regex=True).astype(float).fillna(0)
-    df['inflation rate'] = df['inflation rate'].replace({'\$': '', ',': ''}, regex=True).astype(float).fillna(0)
-    df['Debt'] = df['Debt'].replace({'\$': '', ',': ''}, regex=True).astype(float).fillna(0)
-    df['Increase'] = df['Increase'].replace({'\$': '', ',': ''}, regex=True).astype(float).fillna(0)
+timing.start_rerun("Fud.py")
 
-    return df
-
-df = load_data()
-
-# Step 2: Streamlit App Setup
+# Step 1: Streamlit App Setup
 st.title("Presidential Economic Performance Comparison")
 st.write("""
     Select U.S. Presidents to compare their economic performance based on:
@@ -27,67 +21,88 @@ st.write("""
     - Inflation Rate
     - Debt
     - Increase
+    - Term-level GDP CAGR, debt added per year, debt-to-GDP and compounded inflation
 """)
 
-# Step 3: President and Metric Selection
-presidents = df['President'].unique()
-selected_presidents = st.multiselect("Select Presidents to compare", options=presidents, default=[presidents[0], presidents[1]])
-selected_metrics = st.multiselect("Select Metrics to compare", options=["GDP", "Growth", "Inflation Rate", "Debt", "Increase"], default=["GDP", "Growth"])
-
-# Step 4: Filter and Prepare Data
-comparison_data = {"Metric": selected_metrics}
-
-for president in selected_presidents:
-    pres_data = []
-    df_pres = df[df['President'] == president]
-    for metric in selected_metrics:
-        pres_data.append(df_pres[metric].mean())
-    comparison_data[president] = pres_data
-
-comparison_df = pd.DataFrame(comparison_data)
-
-# Step 5: Display comparison graph
-if not comparison_df.empty:
-    st.header(f"Comparison between Selected Presidents")
-    comparison_chart = alt.Chart(comparison_df).transform_fold(
-        selected_presidents,
-        as_=['President', 'Value']
-    ).mark_bar().encode(
-        x=alt.X('Metric:N', axis=alt.Axis(title='Metric')),
-        y=alt.Y('Value:Q', axis=alt.Axis(title='Value')),
-        color='President:N',
-        column='Metric:N'
-    ).properties(
-        width=200,
-        height=400
-    )
-
-    st.altair_chart(comparison_chart, use_container_width=True)
+# Step 2: Load the data
+with timing.stage("load_data"):
+    dataset = backends.get_backend()
+    streaming.show_progress(dataset)
+    cube = dataset.cube
+watcher.follow(dataset)
+
+@st.cache_resource
+def load_client_spec(version, _dataset):
+    long_df = aggregates.long_frame(_dataset.cube, aggregates.METRIC_LABELS, labels=aggregates.METRIC_LABELS)
+    return charts.interactive_comparison_chart(
+        long_df, _dataset.presidents, list(aggregates.METRIC_LABELS.values()),
+        selected_presidents=_dataset.presidents[:2], selected_metrics=["GDP", "Growth"],
+    ).to_dict()
 
-# Step 6: Show raw data if needed
-st.subheader("Raw Data")
-st.write("Data for comparison:", comparison_df)
+# Step 3: President Selection
+presidents = cube.index.tolist()
+client_side = st.checkbox(
+    "Filter in the browser", value=charts.CLIENT_SIDE,
+    help="Send every president and metric once and filter in the chart itself: "
+         "click legend entries (shift-click for several) and tick metrics below the chart.",
+)
+if client_side:
+    # Everything is sent once and the chart filters in the browser
+    selected_presidents = presidents
+else:
+    selected_presidents = st.multiselect("Select Presidents to compare", options=presidents, default=[presidents[0], presidents[1]])
+
+# Step 4: Metric selection, comparison graph and raw data
+@st.fragment
+def show_comparison(selected_presidents, client_side):
+    with timing.fragment("Fud.py", "comparison"):
+        if client_side:
+            selected_metrics = list(aggregates.METRIC_LABELS)
+        else:
+            selected_metrics = st.multiselect("Select Metrics to compare", options=list(term_metrics.METRIC_LABELS), default=["GDP", "Growth"], format_func=term_metrics.METRIC_LABELS.get)
+        statistics = not client_side and st.checkbox(
+            "Statistics mode",
+            help="95% bootstrap confidence intervals for each mean and permutation-test "
+                 "p-values for each pair of presidents.",
+        )
+        # Term-level metrics have a single value per president: nothing to resample
+        yearly_metrics = [m for m in selected_metrics if m in aggregates.METRIC_LABELS]
+
+        with timing.stage("comparison"):
+            comparison_df, chart_spec = memo.comparison_view(
+                dataset, selected_presidents, selected_metrics, "Fud.py", width=200, height=400
+            )
+
+        if client_side:
+            st.header("Comparison between Selected Presidents")
+            with timing.stage("chart"):
+                st.vega_lite_chart(load_client_spec(dataset.version, dataset), use_container_width=True)
+        elif statistics and selected_presidents and yearly_metrics:
+            # Resampled once per selection and shared by every session
+            with timing.stage("statistics"):
+                intervals, tests, interval_spec = bootstrap.statistics_view(
+                    dataset, selected_presidents, yearly_metrics, width=200, height=400
+                )
+            st.header("Comparison between Selected Presidents (95% confidence intervals)")
+            with timing.stage("chart"):
+                st.vega_lite_chart(interval_spec, use_container_width=True)
+            if len(yearly_metrics) < len(selected_metrics):
+                st.caption("Term-level metrics have one value per president and are not resampled.")
+        elif not comparison_df.empty:
+            st.header(f"Comparison between Selected Presidents")
+            with timing.stage("chart"):
+                st.vega_lite_chart(chart_spec, use_container_width=True)
+
+        st.subheader("Raw Data")
+        with timing.stage("table"):
+            st.write("Data for comparison:", comparison_df)
+            if statistics and len(selected_presidents) > 1 and yearly_metrics:
+                st.write("Permutation tests (p-value: chance of a difference at least this large if both presidents' years came from one distribution):", tests)
+
+show_comparison(selected_presidents, client_side)
 import streamlit as st
-import pandas as pd
-import altair as alt
-
-# Step 1: Load the data and clean it
-@st.cache
-def load_data():
-    df = pd.read_csv('gdp_year_with_more.csv')
 
-    # Remove commas and dollar signs, then convert to numeric
-    df['GDP'] = df['GDP'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    df['Growth'] = df['Growth'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    df['inflation rate'] = df['inflation rate'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    df['Debt'] = df['Debt'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    df['Increase'] = df['Increase'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-
-    return df
-
-df = load_data()
-
-# Step 2: Streamlit App Setup
+# Step 1: Streamlit App Setup
 st.title("Presidential Economic Performance Comparison")
 st.write("""
     Select two U.S. Presidents to compare their economic performance based on:
@@ -98,53 +113,31 @@ st.write("""
     - Increase
 """)
 
+# Step 2: Load the data
+with timing.stage("load_data"):
+    dataset = backends.get_backend()
+    streaming.show_progress(dataset)
+    cube = dataset.cube
+
 # Step 3: President Selection
-presidents = df['President'].unique()
+presidents = cube.index.tolist()
 president1 = st.selectbox("Select the first President", options=presidents)
 president2 = st.selectbox("Select the second President", options=presidents)
 
-# Step 4: Filter Data
-df_pres1 = df[df['President'] == president1]
-df_pres2 = df[df['President'] == president2]
-
-# Step 5: Create comparison data
-comparison_data = {
-    "Metric": ["GDP", "Growth", "Inflation Rate", "Debt", "Increase"],
-    president1: [
-        df_pres1['GDP'].mean(),
-        df_pres1['Growth'].mean(),
-        df_pres1['inflation rate'].mean(),
-        df_pres1['Debt'].mean(),
-        df_pres1['Increase'].mean()
-    ],
-    president2: [
-        df_pres2['GDP'].mean(),
-        df_pres2['Growth'].mean(),
-        df_pres2['inflation rate'].mean(),
-        df_pres2['Debt'].mean(),
-        df_pres2['Increase'].mean()
-    ]
-}
-
-comparison_df = pd.DataFrame(comparison_data)
+# Step 4-5: Create comparison data
+with timing.stage("comparison"):
+    comparison_df, chart_spec = memo.comparison_view(
+        dataset, [president1, president2], aggregates.METRIC_LABELS, "Fud.py", width=200, height=400
+    )
 
 # Step 6: Display comparison graph
 st.header(f"Comparison between {president1} and {president2}")
-comparison_chart = alt.Chart(comparison_df).transform_fold(
-    [president1, president2],
-    as_=['President', 'Value']
-).mark_bar().encode(
-    x=alt.X('Metric:N', axis=alt.Axis(title='Metric')),
-    y=alt.Y('Value:Q', axis=alt.Axis(title='Value')),
-    color='President:N',
-    column='Metric:N'
-).properties(
-    width=200,
-    height=400
-)
-
-st.altair_chart(comparison_chart, use_container_width=True)
+with timing.stage("chart"):
+    st.vega_lite_chart(chart_spec, use_container_width=True)
 
 # Step 7: Show raw data if needed
 st.subheader("Raw Data")
-st.write("Data for comparison:", comparison_df)
+with timing.stage("table"):
+    st.write("Data for comparison:", comparison_df)
+
+timing.finish_rerun()
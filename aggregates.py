@@ -0,0 +1,77 @@
+import pandas as pd
+
+import data_loader
+
+# President x metric aggregate cube.
+#
+# One groupby per dataset version computes every statistic the dashboards
+# show, so a rerun only has to index into the cube instead of filtering the
+# whole frame once per selected president and averaging once per metric.
+
+STATS = ["mean", "sum", "min", "max", "first", "last"]
+
+METRIC_LABELS = {
+    "GDP": "GDP",
+    "Growth": "Growth",
+    "inflation rate": "Inflation Rate",
+    "Debt": "Debt",
+    "Increase": "Increase",
+}
+
+
+def build_cube(df, metrics=data_loader.CURRENCY_COLUMNS, by="President"):
+    """Return a frame indexed by president with (metric, stat) columns.
+
+    Presidents keep the order of their first term in the data. ``first`` and
+    ``last`` are the first/last non-missing value of each president's rows.
+    """
+    return df.groupby(by, sort=False, observed=True)[list(metrics)].agg(STATS)
+
+
+def update_cube(cube, df, start, by="President"):
+    """Return ``cube`` brought up to date after rows ``start:`` were appended to ``df``.
+
+    Only the presidents that appear in the new rows are regrouped (over all
+    of their rows, old and new); every other president's row is reused.
+    """
+    affected = df[by].iloc[start:].dropna().unique()
+    if len(affected) == 0:
+        return cube
+    metrics = list(dict.fromkeys(cube.columns.get_level_values(0)))
+    fresh = build_cube(df[df[by].isin(affected)], metrics, by)
+
+    names = list(cube.index) + [p for p in fresh.index if p not in set(cube.index)]
+    updated = cube.reindex(names)
+    updated.loc[list(fresh.index)] = fresh.to_numpy()
+    if isinstance(df[by].dtype, pd.CategoricalDtype):
+        updated.index = pd.CategoricalIndex(names, dtype=df[by].dtype, name=by)
+    return updated
+
+
+def comparison_frame(cube, presidents, metrics, stat="mean", labels=None, terms=None):
+    """Return the apps' comparison table: a "Metric" column plus one column per president.
+
+    ``terms`` is a president x metric frame (term_metrics.build_term_metrics())
+    to look up the metrics that are not in the cube.
+    """
+    presidents = list(dict.fromkeys(presidents))
+    table = cube.xs(stat, axis=1, level=1).reindex(presidents)
+    if terms is not None:
+        table = pd.concat([table, terms.reindex(presidents)], axis=1)
+    table = table.reindex(columns=list(metrics))
+    comparison = table.T.reset_index(drop=True)
+    comparison.columns = presidents
+    metric_names = [labels.get(m, m) for m in metrics] if labels else list(metrics)
+    comparison.insert(0, "Metric", metric_names)
+    return comparison
+
+
+def long_frame(cube, metrics, stat="mean", labels=None):
+    """Return one (President, Metric, Value) row per president and metric."""
+    table = cube.xs(stat, axis=1, level=1)[list(metrics)]
+    if labels:
+        table = table.rename(columns=labels)
+    long = table.stack().rename("Value").reset_index()
+    long.columns = ["President", "Metric", "Value"]
+    long["President"] = long["President"].astype(str)
+    return long
@@ -1,53 +1,98 @@
-import plotly.express as px
 import streamlit as st
-import pandas as pd
-import plotly as plt
-
-# Load and clean data
-@st.cache
-def load_data():
-    df = pd.read_csv('gdp_year_with_more.csv')
-    df['GDP'] = df['GDP'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    df['Growth'] = df['Growth'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    df['inflation rate'] = df['inflation rate'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    df['Debt'] = df['Debt'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    df['Increase'] = df['Increase'].replace({'\$': '', ',': ''}, regex=True).astype(float)
-    return df
-
-df = load_data()
-
-def create_dashboard():
-    selected_metric = st.selectbox("Select a Metric", df.columns[2:])
-    chart = px.bar(df, x='President', y=selected_metric, color='President')
+
+import aggregates
+import bootstrap
+import distributions
+import timing
+from dataset import get_dataset
+
+# plotly is imported by the chart functions, when the first chart is drawn:
+# the title and selectors come up without waiting for it.
+
+timing.start_rerun("app2.py")
+
+# Streamlit app setup
+st.title("Presidential Economic Performance Comparison")
+
+# Load the data
+with timing.stage("load_data"):
+    dataset = get_dataset()
+    cube = dataset.cube
+
+# Every numeric column after level-current, as the original chart offered
+metric_options = [c for c in dataset.frame.columns[2:] if c != "President"]
+selected_metric = st.selectbox("Select a Metric", options=metric_options,
+                               format_func=lambda m: aggregates.METRIC_LABELS.get(m, m))
+president1 = st.selectbox("Select the first President", options=cube.index.tolist())
+president2 = st.selectbox("Select the second President", options=cube.index.tolist())
+
+# One bar per president (the total of the metric over their terms) instead of
+# one stacked segment per row, so the chart has the same size for any CSV
+def create_dashboard(selected_metric):
+    import plotly.express as px
+
+    chart = px.bar(distributions.totals(dataset, selected_metric), x='President', y=selected_metric, color='President')
     st.plotly_chart(chart)
 
-create_dashboard()
+with timing.stage("chart"):
+    create_dashboard(selected_metric)
 
-# Radar chart for selected presidents
+# Radar chart for selected presidents; every axis is scaled to 0..1 across
+# all presidents because the metrics differ in scale by orders of magnitude
 def plot_radar_chart(president1, president2):
-    metrics = ["GDP", "Growth", "inflation rate", "Debt", "Increase"]
-    df_pres1 = df[df['President'] == president1][metrics].mean().values
-    df_pres2 = df[df['President'] == president2][metrics].mean().values
-
-    radar_data = pd.DataFrame({
-        'Metric': metrics,
-        president1: df_pres1,
-        president2: df_pres2
-    })
-
-    fig = px.line_polar(radar_data, r='Metric', theta=metrics, line_close=True,
-                        color_discrete_sequence=px.colors.qualitative.Set1)
-    fig.update_traces(fill='toself')
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    metrics = list(aggregates.METRIC_LABELS)
+    radar_data = distributions.radar(dataset, metrics)
+    theta = [aggregates.METRIC_LABELS[m] for m in metrics]
+
+    fig = go.Figure()
+    for president, color in zip(dict.fromkeys([president1, president2]), px.colors.qualitative.Set1):
+        r = radar_data.loc[president].tolist()
+        fig.add_trace(go.Scatterpolar(r=r + r[:1], theta=theta + theta[:1], name=president,
+                                      fill='toself', line_color=color))
+    fig.update_layout(polar=dict(radialaxis=dict(range=[0, 1])))
     return fig
 
-# Streamlit app setup
-st.title("Presidential Economic Performance Comparison")
-president1 = st.selectbox("Select the first President", options=df['President'].unique())
-president2 = st.selectbox("Select the second President", options=df['President'].unique())
+with timing.stage("radar"):
+    st.plotly_chart(plot_radar_chart(str(president1), str(president2)))
+
+# Means with 95% bootstrap confidence intervals and a permutation test per
+# metric, to tell whether the two presidents really differ (cached per pair)
+def plot_confidence_intervals(president1, president2):
+    import plotly.express as px
+
+    metrics = list(aggregates.METRIC_LABELS)
+    intervals, tests = bootstrap.compare(dataset, [president1, president2], metrics)
+    intervals["Metric"] = intervals["Metric"].map(aggregates.METRIC_LABELS)
+    tests["Metric"] = tests["Metric"].map(aggregates.METRIC_LABELS)
+
+    fig = px.bar(intervals, x='President', y='Mean', color='President', facet_col='Metric',
+                 error_y=intervals['High'] - intervals['Mean'], error_y_minus=intervals['Mean'] - intervals['Low'])
+    fig.update_yaxes(matches=None, showticklabels=True)  # metrics differ in scale
+    st.plotly_chart(fig)
+    if len(tests):
+        st.write("Permutation tests:", tests)
+
+if st.checkbox("Show confidence intervals"):
+    with timing.stage("statistics"):
+        plot_confidence_intervals(str(president1), str(president2))
+
+# Histogram and KDE from precomputed bins and curve, not from the raw rows
+def plot_distribution(metric="GDP"):
+    import plotly.graph_objects as go
+
+    data = distributions.distribution(dataset, metric)
+    edges = data["edges"]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=data["counts"], width=edges[1:] - edges[:-1],
+                         name="Count", marker_line_width=0, opacity=0.6))
+    fig.add_trace(go.Scatter(x=data["grid"], y=data["density"], mode="lines", name="KDE"))
+    fig.update_layout(xaxis_title=aggregates.METRIC_LABELS.get(metric, metric), yaxis_title="Count", bargap=0)
+    st.plotly_chart(fig)
 
-def plot_distribution():
-    fig, ax = plt.subplots()
-    sns.histplot(df['GDP'], kde=True, ax=ax)
-    st.pyplot(fig)
+with timing.stage("distribution"):
+    plot_distribution()
 
-plot_distribution()
+timing.finish_rerun()
@@ -0,0 +1,331 @@
+import functools
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import data_loader
+import streaming
+import term_metrics
+from dataset import get_dataset
+
+# Query backends for "filter by president/years, aggregate metrics".
+#
+# The dashboards only ask a backend for its version, its presidents and the
+# president x (metric, stat) cube, optionally restricted to some presidents
+# and a window of years, the term-level metrics (term_metrics.py) and the raw
+# rows of one or several presidents' terms (rows_by_president fetches several
+# in one query or one pass over the file).
+#
+#   pandas  the shared in-memory Dataset (dataset.py) with its TermIndex;
+#           fastest while the data fits comfortably in memory.
+#   duckdb  an embedded DuckDB database reading the Parquet or CSV file
+#           itself, so tens of millions of rows never have to become a
+#           pandas frame; only the aggregated result does.
+#   stream  reads the CSV in chunks in a background thread (streaming.py),
+#           holding one chunk at a time; partial results are available
+#           while it runs. Filtered queries stream the file again.
+#
+# P4_BACKEND picks one (default pandas). Both return identical frames, see
+# benchmarks/bench_backends.py for the parity check.
+
+BACKEND = os.environ.get("P4_BACKEND", "pandas")
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.version = dataset.version
+
+    @property
+    def cube(self):
+        return self.dataset.cube
+
+    @property
+    def presidents(self):
+        return self.dataset.presidents
+
+    @property
+    def term_metrics(self):
+        return self.dataset.term_metrics
+
+    def aggregate(self, presidents=None, metrics=data_loader.CURRENCY_COLUMNS,
+                  stats=aggregates.STATS, first=None, last=None):
+        """Return the cube for ``presidents`` over years ``first..last`` inclusive."""
+        if first is None and last is None:
+            cube = self.dataset.cube
+        else:
+            rows = self.dataset.term_index.years(first, last)
+            cube = aggregates.build_cube(rows, metrics)
+        cube = cube.loc[:, pd.MultiIndex.from_product([list(metrics), list(stats)])]
+        if presidents is not None:
+            cube = cube.reindex(list(presidents))
+        cube.index = pd.Index(cube.index.astype(str), name="President")
+        return cube
+
+    def rows(self, president, first=None, last=None):
+        return self.dataset.term_index.rows(president, first, last)
+
+    def rows_by_president(self, presidents, first=None, last=None):
+        """Return ``{president: rows}`` for ``presidents``."""
+        return self.dataset.rows_by_president(presidents, first, last)
+
+
+def _numeric_sql(column, percent):
+    # Same rules as data_loader's parser: "$" and "," are dropped, "(...)"
+    # is negative, blanks and text that is not shaped like a number
+    # (data_loader.NUMBER_PATTERN) become NULL, and a "%" divides by 100 in
+    # percentage columns.
+    quoted = f'"{column}"'
+    pattern = "'" + data_loader.NUMBER_PATTERN.replace("'", "''") + "'"
+    value = (
+        f"CASE WHEN regexp_full_match({quoted}, {pattern})"
+        f" THEN TRY_CAST(regexp_replace({quoted}, '[$,()%+\\s]', '', 'g') AS DOUBLE) END"
+        f" * CASE WHEN strpos({quoted}, '(') > 0 THEN -1 ELSE 1 END"
+    )
+    if percent:
+        value += f" / CASE WHEN strpos({quoted}, '%') > 0 THEN 100 ELSE 1 END"
+    return f"CAST({value} AS DOUBLE) AS {quoted}"
+
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    _STAT_SQL = {
+        "mean": "avg({c})",
+        "sum": "coalesce(sum({c}), 0)",
+        "min": "min({c})",
+        "max": "max({c})",
+        # First/last non-missing value in file order, like pandas' first/last.
+        "first": "first({c} ORDER BY row) FILTER (WHERE {c} IS NOT NULL)",
+        "last": "last({c} ORDER BY row) FILTER (WHERE {c} IS NOT NULL)",
+    }
+
+    def __init__(self, path):
+        try:
+            import duckdb  # optional, and only imported when this backend is used
+        except ImportError:
+            raise ImportError("P4_BACKEND=duckdb needs the duckdb package (pip install duckdb)") from None
+        stat = os.stat(path)
+        self.path = path
+        self.version = f"duckdb:{stat.st_mtime_ns}:{stat.st_size}"
+        self._con = duckdb.connect()
+        source = "'" + path.replace("'", "''") + "'"
+        if path.endswith(".parquet"):
+            # Already cleaned (e.g. a data_loader snapshot): query the file in place.
+            self._con.execute(
+                "CREATE VIEW data AS SELECT * EXCLUDE (file_row_number)"
+                " REPLACE (CAST(President AS VARCHAR) AS President), file_row_number AS row"
+                f" FROM read_parquet({source}, file_row_number = true)"
+            )
+        else:
+            # Parse the currency text once into DuckDB's own columnar storage.
+            types = {c: "VARCHAR" for c in data_loader.CURRENCY_COLUMNS}
+            cleaned = ", ".join(
+                _numeric_sql(c, c in data_loader.PERCENT_COLUMNS) for c in data_loader.CURRENCY_COLUMNS
+            )
+            self._con.execute(
+                f"CREATE TABLE data AS SELECT * REPLACE ({cleaned}), row_number() OVER () - 1 AS row"
+                f" FROM read_csv({source}, header = true, types = {types!r})"
+            )
+
+    def _query(self, sql, params=()):
+        # One cursor per call: DuckDB connections must not be shared between
+        # threads, cursors are cheap.
+        return self._con.cursor().execute(sql, list(params)).df()
+
+    @functools.cached_property
+    def cube(self):
+        return self.aggregate()
+
+    @functools.cached_property
+    def presidents(self):
+        return self._query(
+            "SELECT President FROM data WHERE President IS NOT NULL"
+            " GROUP BY President ORDER BY min(row)"
+        )["President"].tolist()
+
+    @functools.cached_property
+    def term_metrics(self):
+        columns = ", ".join(f'"{c}"' for c in term_metrics.COLUMNS)
+        return term_metrics.build_term_metrics(self._query(f"SELECT {columns} FROM data ORDER BY row"))
+
+    def aggregate(self, presidents=None, metrics=data_loader.CURRENCY_COLUMNS,
+                  stats=aggregates.STATS, first=None, last=None):
+        """Return the cube for ``presidents`` over years ``first..last`` inclusive."""
+        columns = [
+            self._STAT_SQL[stat].format(c=f'"{metric}"') + f' AS "{metric}|{stat}"'
+            for metric in metrics for stat in stats
+        ]
+        where, params = ["President IS NOT NULL"], []
+        if first is not None:
+            where.append("date >= ?")
+            params.append(first)
+        if last is not None:
+            where.append("date <= ?")
+            params.append(last)
+        if presidents is not None:
+            where.append(f"President IN ({', '.join('?' * len(presidents))})")
+            params.extend(presidents)
+        result = self._query(
+            f"SELECT President, {', '.join(columns)} FROM data WHERE {' AND '.join(where)}"
+            " GROUP BY President ORDER BY min(row)",
+            params,
+        ).set_index("President")
+        result.columns = pd.MultiIndex.from_tuples([tuple(c.split("|")) for c in result.columns])
+        if presidents is not None:
+            result = result.reindex(list(presidents))
+        return result
+
+    def rows(self, president, first=None, last=None):
+        return self.rows_by_president([president], first, last)[president]
+
+    def rows_by_president(self, presidents, first=None, last=None):
+        """Return ``{president: rows}`` for ``presidents``, from one query."""
+        presidents = list(presidents)
+        where, params = [f"President IN ({', '.join('?' * len(presidents))})"], list(presidents)
+        if first is not None:
+            where.append("date >= ?")
+            params.append(first)
+        if last is not None:
+            where.append("date <= ?")
+            params.append(last)
+        result = self._query(
+            f"SELECT * EXCLUDE (row) FROM data WHERE {' AND '.join(where)} ORDER BY row", params
+        )
+        return _split_by_president(result, presidents)
+
+
+class StreamingBackend:
+    name = "stream"
+
+    def __init__(self, path):
+        stat = os.stat(path)
+        self.path = path
+        self.version = f"stream:{stat.st_mtime_ns}:{stat.st_size}"
+        self.rows_read = 0
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._fraction = 0.0
+        self._partial = streaming.CubeAccumulator().cube()
+        self._cube = None
+        self._error = None
+        threading.Thread(target=self._ingest, name="p4-ingest", daemon=True).start()
+
+    def _ingest(self):
+        def publish(accumulator, fraction):
+            cube = accumulator.cube()
+            with self._lock:
+                self._fraction, self._partial, self.rows_read = fraction, cube, accumulator.rows
+
+        try:
+            self._cube = streaming.stream_cube(self.path, on_progress=publish)
+        except Exception as e:
+            self._error = e
+        finally:
+            self.done.set()
+
+    def snapshot(self):
+        """Return ``(fraction read, cube so far)`` while ingesting."""
+        with self._lock:
+            return self._fraction, self._partial
+
+    @property
+    def cube(self):
+        self.done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._cube
+
+    @property
+    def presidents(self):
+        return self.cube.index.tolist()
+
+    @functools.cached_property
+    def term_metrics(self):
+        # Each chunk is cut down to the first row of each year (the only rows
+        # the metrics read) before the next one is read, so this holds about
+        # one row per year plus one chunk, not the whole file.
+        years, previous_date = [], None
+        for chunk, _ in streaming.iter_chunks(self.path):
+            if len(chunk):
+                years.append(term_metrics.first_of_year(chunk[term_metrics.COLUMNS], previous_date))
+                previous_date = chunk["date"].iloc[-1]
+        return term_metrics.build_term_metrics(pd.concat(years, ignore_index=True))
+
+    def _filtered_chunks(self, presidents=None, first=None, last=None):
+        for chunk, _ in streaming.iter_chunks(self.path):
+            keep = np.ones(len(chunk), dtype=bool)
+            if presidents is not None:
+                keep &= chunk["President"].isin(presidents).to_numpy()
+            if first is not None:
+                keep &= (chunk["date"] >= first).to_numpy()
+            if last is not None:
+                keep &= (chunk["date"] <= last).to_numpy()
+            yield chunk[keep]
+
+    def aggregate(self, presidents=None, metrics=data_loader.CURRENCY_COLUMNS,
+                  stats=aggregates.STATS, first=None, last=None):
+        """Return the cube for ``presidents`` over years ``first..last`` inclusive."""
+        if first is None and last is None:
+            cube = self.cube
+        else:
+            accumulator = streaming.CubeAccumulator(metrics)
+            for chunk in self._filtered_chunks(first=first, last=last):
+                accumulator.update(chunk)
+            cube = accumulator.cube()
+        cube = cube.loc[:, pd.MultiIndex.from_product([list(metrics), list(stats)])]
+        if presidents is not None:
+            cube = cube.reindex(list(presidents))
+        return cube
+
+    def rows(self, president, first=None, last=None):
+        return pd.concat(list(self._filtered_chunks([president], first, last)), ignore_index=True)
+
+    def rows_by_president(self, presidents, first=None, last=None):
+        """Return ``{president: rows}`` for ``presidents``, from one pass over the file."""
+        presidents = list(presidents)
+        rows = pd.concat(list(self._filtered_chunks(presidents, first, last)), ignore_index=True)
+        return _split_by_president(rows, presidents)
+
+
+def _split_by_president(rows, presidents):
+    # Every president gets a frame, an empty one if it has no rows.
+    groups = dict(iter(rows.groupby(rows["President"].astype(str), sort=False)))
+    return {
+        president: groups[president].reset_index(drop=True) if president in groups else rows.iloc[0:0]
+        for president in presidents
+    }
+
+
+_lock = threading.Lock()
+_backends = {}
+
+
+def get_backend(name=None, path=None):
+    """Return the process-wide backend for ``path``, rebuilt when the file changes.
+
+    ``name`` defaults to P4_BACKEND and ``path`` to data_loader.CSV_PATH.
+    """
+    name = name or BACKEND
+    path = path or data_loader.CSV_PATH
+    if name == "pandas":
+        dataset = get_dataset(path)
+        with _lock:
+            cached = _backends.get((name, path))
+            if cached is None or cached.dataset is not dataset:
+                cached = _backends[(name, path)] = PandasBackend(dataset)
+            return cached
+    if name in ("duckdb", "stream"):
+        backend_class = DuckDBBackend if name == "duckdb" else StreamingBackend
+        stat = os.stat(path)
+        with _lock:
+            cached = _backends.get((name, path))
+            if cached is None or cached.version != f"{name}:{stat.st_mtime_ns}:{stat.st_size}":
+                cached = _backends[(name, path)] = backend_class(path)
+            return cached
+    raise ValueError(f"unknown backend {name!r} (expected 'pandas', 'duckdb' or 'stream')")
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import synthetic
+import aggregates
+import data_loader
+import dataset
+
+# Refresh cost when one year is appended to the CSV: full reparse and
+# regroup against the incremental path (prefix hash, parse the tail, update
+# the affected presidents). The incrementally updated cube is checked against
+# a from-scratch build_cube(); a mismatch exits 1.
+
+NEW_YEAR = "{year},1,1,1,1,{president},1,1,1,0.01,\"$1,000.00 \",\"($2.00)\"\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full reload vs incremental refresh after an append.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        data_loader.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+        print(f"{'rows':>12} {'full reload s':>14} {'append refresh s':>17} {'speedup':>8}")
+        for scale in args.scales:
+            rows = synthetic.base_rows() * scale
+            path = synthetic.write_scaled_csv(os.path.join(tmp, f"x{scale}.csv"), rows)
+            dataset._datasets.clear()
+            before = dataset.get_dataset(path)
+            before.cube
+            last = before.frame.iloc[-1]
+
+            with open(path, "a") as f:
+                f.write(NEW_YEAR.format(year=int(last["date"]) + 1, president=last["President"]))
+
+            start = time.perf_counter()
+            after = dataset.get_dataset(path)
+            cube = after.cube
+            incremental = time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = aggregates.build_cube(data_loader.parse_csv(path))
+            full = time.perf_counter() - start
+
+            try:
+                assert after is not before and len(after.frame) == rows + 1
+                pd.testing.assert_frame_equal(cube, expected, check_exact=False, rtol=1e-12)
+                status = ""
+            except AssertionError as e:
+                failed = True
+                status = f"  MISMATCH: {e}"
+            print(f"{rows:>12,} {full:14.3f} {incremental:17.3f} {full / incremental:7.1f}x{status}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import synthetic
+import backends
+import data_loader
+import dataset
+
+# Parity and speed of the query backends across data sizes.
+#
+# For every size the same queries go to the pandas backend, DuckDB over the
+# raw CSV and DuckDB over the Parquet snapshot. Every result, and each
+# backend's presidents, term-level metrics and first president's rows, is
+# compared with the pandas one; any difference is reported and the script
+# exits 1.
+# The pandas backend's unfiltered cube is built once per dataset version, so
+# its "full cube" time is a cache hit; the other queries are computed.
+
+
+def queries(presidents, years):
+    mid = (years[0] + years[1]) // 2
+    return {
+        "full cube": {},
+        "year window": {"first": mid - 10, "last": mid + 10},
+        "2 presidents": {"presidents": presidents[:2]},
+        "2 presidents, window": {"presidents": presidents[-2:], "first": mid},
+    }
+
+
+def make_backends(csv_path):
+    """Yield (label, seconds to open, backend) for every backend over ``csv_path``."""
+    dataset._datasets.clear()
+    start = time.perf_counter()
+    pandas_backend = backends.get_backend("pandas", csv_path)
+    yield "pandas", time.perf_counter() - start, pandas_backend
+
+    snapshot = data_loader._snapshot_path(csv_path, pandas_backend.version)
+    for label, path in [("duckdb csv", csv_path), ("duckdb parquet", snapshot)]:
+        start = time.perf_counter()
+        backend = backends.DuckDBBackend(path)
+        yield label, time.perf_counter() - start, backend
+
+
+def timed(backend, kwargs, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = backend.aggregate(**kwargs)
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def same(result, expected):
+    """Raise AssertionError unless ``result`` matches ``expected`` up to dtypes and rounding."""
+    if isinstance(expected, list):
+        assert result == expected, f"{result} != {expected}"
+        return
+    result, expected = result.reset_index(drop=True), expected.reset_index(drop=True)
+    if "President" in expected:
+        result, expected = result.astype({"President": str}), expected.astype({"President": str})
+    numeric = [c for c in expected if c != "President"]
+    pd.testing.assert_frame_equal(
+        result.astype(dict.fromkeys(numeric, float)), expected.astype(dict.fromkeys(numeric, float)),
+        check_exact=False, rtol=1e-9, check_names=False,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity and speed of the pandas and DuckDB backends.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        data_loader.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+        for scale in args.scales:
+            rows = synthetic.base_rows() * scale
+            csv_path = synthetic.write_scaled_csv(os.path.join(tmp, f"x{scale}.csv"), rows)
+            print(f"\n{rows:,} rows")
+            print(f"  {'backend':<15} {'open ms':>9}  " + "  ".join(f"{name:>20}" for name in queries([], (0, 0))))
+
+            reference = {}
+            for label, opened, backend in make_backends(csv_path):
+                frame = backend.rows(backend.presidents[0])
+                years = (int(frame["date"].min()), int(frame["date"].max()) + 40)
+                # The first (pandas) backend's results are the reference.
+                checks = {"presidents": backend.presidents, "term metrics": backend.term_metrics, "rows": frame}
+                for name, result in checks.items():
+                    try:
+                        same(result, reference.setdefault(name, result))
+                    except AssertionError as e:
+                        mismatches += 1
+                        print(f"  {label} {name}: {e}", file=sys.stderr)
+                cells = []
+                for name, kwargs in queries(backend.presidents, years).items():
+                    result, seconds = timed(backend, kwargs, args.repeat)
+                    expected = reference.setdefault(name, result)
+                    try:
+                        same(result, expected)
+                        cells.append(f"{seconds * 1e3:17.2f} ms")
+                    except AssertionError as e:
+                        mismatches += 1
+                        cells.append(f"{'MISMATCH':>20}")
+                        print(f"  {label} {name}: {e}", file=sys.stderr)
+                print(f"  {label:<15} {opened * 1e3:9.1f}  " + "  ".join(cells))
+
+    if mismatches:
+        print(f"\n{mismatches} results differ from pandas")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import time
+
+import pandas as pd
+
+import synthetic  # noqa: F401  (puts the repo root on sys.path)
+import aggregates
+import bootstrap
+import dataset
+
+# Cost of the statistics mode for growing selections.
+#
+# For each selection size (the first N presidents, every yearly metric):
+# uncached in-process, uncached over the process pool (started beforehand,
+# as it is after a server's first large selection) and cached, which is what
+# a rerun costs. The pool's results are checked against the in-process ones.
+
+
+def timed(compute):
+    start = time.perf_counter()
+    result = compute()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap/permutation cost: serial, pool and cached.")
+    parser.add_argument("--presidents", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--resamples", type=int, default=bootstrap.RESAMPLES)
+    parser.add_argument("--workers", type=int, default=bootstrap.WORKERS)
+    args = parser.parse_args()
+
+    bootstrap.WORKERS = args.workers
+    bootstrap.PARALLEL_TASKS = 1
+    data = dataset.get_dataset()
+    metrics = list(aggregates.METRIC_LABELS)
+    if args.workers > 1:
+        # Start the workers outside the timings.
+        bootstrap.compare(data, data.presidents[:2], metrics[:1], resamples=10)
+
+    print(f"{'presidents':>10} {'tasks':>6} {'serial ms':>10} {'pool ms':>9} {'cached ms':>10}")
+    for count in args.presidents:
+        presidents = data.presidents[:count]
+        tasks = len(metrics) * (count + count * (count - 1) // 2)
+
+        bootstrap.results.clear()
+        serial, serial_seconds = timed(
+            lambda: bootstrap.compare(data, presidents, metrics, args.resamples, parallel=False))
+        bootstrap.results.clear()
+        pooled, pool_seconds = timed(lambda: bootstrap.compare(data, presidents, metrics, args.resamples))
+        _, cached_seconds = timed(lambda: bootstrap.compare(data, presidents, metrics, args.resamples))
+
+        for expected, got in zip(serial, pooled):
+            pd.testing.assert_frame_equal(expected, got)
+        print(f"{count:>10} {tasks:>6} {serial_seconds * 1e3:10.1f} {pool_seconds * 1e3:9.1f} "
+              f"{cached_seconds * 1e3:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import os
+import tempfile
+import time
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+import synthetic
+import data_loader
+import dataset
+import distributions
+
+# Cost of app2.py's distribution and totals charts as the data grows.
+#
+# "raw" is how the charts used to be built: from every row (a histogram of
+# the values and a stacked bar segment per row). "cached" builds them the way
+# app2.py does now, from distributions.py's precomputed bins, KDE curve and
+# per-president totals on a warm memo, as in a rerun. Reported per size: the
+# time to build the figures and serialize them, and the JSON size, which is
+# what the browser has to receive and draw.
+
+METRIC = "GDP"
+
+
+def raw_figures(frame):
+    return [
+        px.histogram(frame, x=METRIC),
+        px.bar(frame, x="President", y=METRIC, color="President"),
+    ]
+
+
+def cached_figures(data):
+    hist = distributions.distribution(data, METRIC)
+    edges = hist["edges"]
+    distribution = go.Figure([
+        go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=hist["counts"], width=edges[1:] - edges[:-1]),
+        go.Scatter(x=hist["grid"], y=hist["density"], mode="lines"),
+    ])
+    totals = px.bar(distributions.totals(data, METRIC), x="President", y=METRIC, color="President")
+    return [distribution, totals]
+
+
+def measure(build):
+    start = time.perf_counter()
+    size = sum(len(figure.to_json()) for figure in build())
+    return time.perf_counter() - start, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app2.py chart cost from raw rows vs precomputed data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'raw ms':>9} {'raw KB':>9} {'cached ms':>10} {'cached KB':>10} {'first build ms':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_loader.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+        for scale in args.scales:
+            rows = synthetic.base_rows() * scale
+            path = synthetic.write_scaled_csv(os.path.join(tmp, f"x{scale}.csv"), rows)
+            data = dataset.get_dataset(path)
+            data.cube
+
+            raw_seconds, raw_size = measure(lambda: raw_figures(data.frame))
+            distributions.views.clear()
+            first_seconds, _ = measure(lambda: cached_figures(data))
+            cached_seconds, cached_size = measure(lambda: cached_figures(data))
+            print(f"{rows:>10,} {raw_seconds * 1e3:9.1f} {raw_size / 1024:9.0f} {cached_seconds * 1e3:10.1f} "
+                  f"{cached_size / 1024:10.0f} {first_seconds * 1e3:15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import time
+
+import numpy as np
+
+import synthetic
+import aggregates
+import data_loader
+
+
+def legacy_schema(df):
+    # The original load_data() output: object strings, int64 and float64.
+    df = df.astype({c: np.float64 for c in df.select_dtypes("floating").columns})
+    return df.astype({"President": object, "date": np.int64})
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and groupby speed per loaded schema.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[100, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'schema':<18} {'memory':>10} {'groupby mean':>13} {'cube':>9}")
+    for scale in args.scales:
+        compact = synthetic.scaled_clean(synthetic.base_rows() * scale)
+        schemas = {
+            "legacy": legacy_schema(compact),
+            "compact": compact,
+            "compact+float32": data_loader.downcast_floats(compact),
+        }
+        for name, df in schemas.items():
+            memory = df.memory_usage(deep=True).sum()
+            metrics = data_loader.CURRENCY_COLUMNS
+            groupby = best_of(lambda: df.groupby("President", sort=False, observed=True)[metrics].mean(), args.repeat)
+            cube = best_of(lambda: aggregates.build_cube(df), args.repeat)
+            print(f"{len(df):>10,} {name:<18} {memory / 1e6:>8.2f}MB {groupby * 1e3:>11.2f}ms {cube * 1e3:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
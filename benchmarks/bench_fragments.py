@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+
+import synthetic
+import aggregates
+import dataset
+import st_client
+
+# Rerun cost of each interaction with and without fragment-scoped reruns.
+#
+# Every interaction is replayed twice against a real server: once the way
+# the browser sends it (a widget inside an st.fragment reruns only that
+# fragment) and once forced to a full-page rerun, which is what the page did
+# before it was split into fragments. The "watch poll" row is the version
+# check every open tab reruns each P4_WATCH_INTERVAL seconds (watcher.follow),
+# i.e. what a session costs while nobody touches it. Reported per
+# interaction: wall time, server time from the timing log, and bytes sent to
+# the browser.
+
+APPS = ["Fud.py", "Prespic.py", "WHA.py"]
+PRESIDENTS_LABEL = "Select Presidents to compare"
+METRICS_LABEL = "Select Metrics to compare"
+
+
+def interactions(presidents):
+    labels = list(aggregates.METRIC_LABELS.values())
+    return [
+        ("metrics", METRICS_LABEL, [labels[:1], labels]),
+        ("presidents", PRESIDENTS_LABEL, [presidents[:2], presidents[:10]]),
+    ]
+
+
+def server_seconds(log_path):
+    with open(log_path) as f:
+        return json.loads(f.readlines()[-1])["total"]
+
+
+def bench_app(app, presidents, repeat, env):
+    results = []
+    with st_client.serve(app, env=env) as (url, _):
+        session = st_client.Session(url)
+        try:
+            session.rerun()
+            for name, label, values in interactions(presidents):
+                for fragment in (False, True):
+                    walls, servers, sizes = [], [], []
+                    for i in range(repeat):
+                        seconds, size, error = session.set(label, values[i % 2], fragment=fragment)
+                        if error:
+                            raise RuntimeError(f"{app}: {error}")
+                        walls.append(seconds)
+                        servers.append(server_seconds(env["P4_TIMING_LOG"]))
+                        sizes.append(size)
+                    results.append({
+                        "app": app, "interaction": name,
+                        "rerun": "fragment" if fragment else "full page",
+                        "wall": statistics.median(walls), "server": statistics.median(servers),
+                        "bytes": statistics.median(sizes),
+                    })
+            for fragment_id in session.auto_reruns:
+                walls, servers, sizes = [], [], []
+                for _ in range(repeat):
+                    seconds, size, error = session.rerun(fragment_id)
+                    if error:
+                        raise RuntimeError(f"{app}: {error}")
+                    walls.append(seconds)
+                    servers.append(server_seconds(env["P4_TIMING_LOG"]))
+                    sizes.append(size)
+                results.append({
+                    "app": app, "interaction": "watch poll", "rerun": "fragment",
+                    "wall": statistics.median(walls), "server": statistics.median(servers),
+                    "bytes": statistics.median(sizes),
+                })
+        finally:
+            session.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-page vs fragment rerun cost per interaction.")
+    parser.add_argument("--apps", nargs="+", default=APPS)
+    parser.add_argument("--scale", type=int, default=100, help="rows = base rows x scale")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "P4_CSV_PATH": synthetic.write_scaled_csv(
+                os.path.join(tmp, "data.csv"), synthetic.base_rows() * args.scale),
+            "P4_SNAPSHOT_DIR": os.path.join(tmp, "snapshots"),
+            "P4_PORTRAIT_CACHE": os.path.join(tmp, "portraits"),
+            "P4_PORTRAIT_SOURCE": tmp,  # offline: placeholders, no downloads
+            "P4_TIMING": "1",
+            "P4_TIMING_LOG": os.path.join(tmp, "timings.jsonl"),
+        }
+        presidents = dataset.get_dataset().presidents
+        print(f"{'app':<11} {'interaction':<11} {'rerun':<10} {'wall ms':>8} {'server ms':>10} {'bytes':>8}")
+        for app in args.apps:
+            for r in bench_app(app, presidents, args.repeat, env):
+                results.append(r)
+                print(f"{r['app']:<11} {r['interaction']:<11} {r['rerun']:<10} {r['wall'] * 1e3:8.1f} "
+                      f"{r['server'] * 1e3:10.2f} {r['bytes']:8.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
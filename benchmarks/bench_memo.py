@@ -0,0 +1,68 @@
+import argparse
+import time
+
+import numpy as np
+
+import synthetic
+import aggregates
+import charts
+import dataset
+import memo
+
+# Cost of serving comparison views to many sessions with and without the
+# cross-session memo. Selections follow a Zipf-like popularity so a few
+# pairs come up again and again, the way real traffic does, and most
+# sessions keep the default metrics. The seed is fixed so runs are comparable.
+
+
+def selections(presidents, sessions, seed):
+    rng = np.random.default_rng(seed)
+    metrics = list(aggregates.METRIC_LABELS)
+    weights = 1.0 / np.arange(1, len(presidents) + 1)
+    weights /= weights.sum()
+    for _ in range(sessions):
+        pair = rng.choice(len(presidents), size=2, replace=False, p=weights)
+        if rng.random() < 0.7:
+            chosen = [0, 1]  # the apps' default, GDP and Growth
+        else:
+            chosen = sorted(rng.choice(len(metrics), size=rng.integers(1, len(metrics) + 1), replace=False))
+        yield [presidents[i] for i in pair], [metrics[i] for i in chosen]
+
+
+def uncached(data, presidents, metrics):
+    frame = aggregates.comparison_frame(data.cube, presidents, metrics, labels=aggregates.METRIC_LABELS)
+    return frame, charts.comparison_chart(frame, presidents).to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparison views per session with and without the memo.")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=memo.MAX_ENTRIES, help="memo entries (P4_MEMO_SIZE)")
+    args = parser.parse_args()
+
+    data = dataset.get_dataset()
+    work = list(selections(data.presidents, args.sessions, args.seed))
+
+    start = time.perf_counter()
+    for presidents, metrics in work:
+        uncached(data, presidents, metrics)
+    before = time.perf_counter() - start
+
+    memo.comparisons.clear()
+    memo.comparisons.maxsize = args.size
+    start = time.perf_counter()
+    for presidents, metrics in work:
+        memo.comparison_view(data, presidents, metrics, "bench")
+    after = time.perf_counter() - start
+
+    stats = memo.comparisons.stats()
+    distinct = len({(tuple(sorted(p)), tuple(m)) for p, m in work})
+    print(f"{args.sessions} selections, {distinct} distinct, {stats['misses']} misses")
+    print(f"rebuild every time: {before / args.sessions * 1e3:7.3f} ms/selection")
+    print(f"shared memo:        {after / args.sessions * 1e3:7.3f} ms/selection  "
+          f"({before / after:.1f}x, hit rate {stats['hit_rate']:.0%}, {stats['entries']} entries)")
+
+
+if __name__ == "__main__":
+    main()
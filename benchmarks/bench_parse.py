@@ -0,0 +1,79 @@
+import argparse
+import time
+
+import numpy as np
+
+import synthetic
+from data_loader import CURRENCY_COLUMNS, parse_numeric_columns, parse_numeric_text
+
+
+def legacy_clean(df):
+    # What every app's load_data() did: one regex replace per column, then astype.
+    df = df.copy()
+    for column in CURRENCY_COLUMNS:
+        df[column] = df[column].replace(
+            {r'\$': '', ',': '', r'^\s*\((.*)\)\s*$': r'-\1'}, regex=True
+        ).astype(float)
+    return df
+
+
+# Signs, parentheses, percent signs and commas in the wrong place are not
+# numbers; the same characters in the right place are. Commas only separate
+# thousands, and a long bad cell is reported without widening the fast path.
+MALFORMED = [
+    "1-2", "12-", "1(2)", "5%3", "1.5,3", ",5", "5,", "--1", "1 2",
+    "1,5", "1234,5", "2,5%", "1,23,456", "1,2345", "garbage " * 375,
+]
+WELL_FORMED = {
+    "($2.00)": -2.0, "$1,234.50 ": 1234.5, "5%": 5.0, "-3": -3.0, "\xa012\xa0": 12.0, "1e5": 1e5,
+    "12,345,678.9": 12345678.9,
+}
+
+
+def check_shapes():
+    values, _, bad = parse_numeric_text(np.array(MALFORMED, dtype=object))
+    assert np.isnan(values).all() and bad.all(), dict(zip(MALFORMED, values))
+    start = time.perf_counter()
+    parse_numeric_text(np.array(["$1,234.50"] * 65535 + MALFORMED[-1:], dtype=object))
+    assert time.perf_counter() - start < 1, "a long bad cell slowed the whole chunk down"
+    values, _, bad = parse_numeric_text(np.array(list(WELL_FORMED), dtype=object))
+    assert not bad.any() and values.tolist() == list(WELL_FORMED.values()), dict(zip(WELL_FORMED, values))
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark currency column parsing.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    check_shapes()
+    raw = synthetic.scaled_raw(args.rows)
+    print(f"{len(raw):,} rows x {len(CURRENCY_COLUMNS)} currency columns")
+
+    legacy_time, legacy = best_of(lambda: legacy_clean(raw), args.repeat)
+    new_time, (parsed, bad_cells) = best_of(lambda: parse_numeric_columns(raw), args.repeat)
+
+    for column in CURRENCY_COLUMNS:
+        a = legacy[column].to_numpy()
+        b = parsed[column].to_numpy()
+        assert np.array_equal(a, b, equal_nan=True), f"{column} differs from legacy parse"
+    # Trillion-scale debt must survive to the cent.
+    cents = np.round(parsed["Debt"].to_numpy() * 100)
+    assert np.array_equal(cents / 100, parsed["Debt"].to_numpy()), "Debt lost cent precision"
+
+    print(f"legacy regex x{len(CURRENCY_COLUMNS)}: {legacy_time:8.3f}s")
+    print(f"parse_numeric_columns:  {new_time:8.3f}s  ({legacy_time / new_time:.1f}x)")
+    print(f"bad cells: {len(bad_cells)}")
+
+
+if __name__ == "__main__":
+    main()
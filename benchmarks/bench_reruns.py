@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import synthetic
+import aggregates
+import backends
+import bootstrap
+import data_loader
+import dataset
+import distributions
+import memo
+import portraits
+import timing
+
+from streamlit.testing.v1 import AppTest
+
+APPS = ["AZ.py", "app2.py", "Fud.py", "Prespic.py", "WHA.py"]
+PRESIDENTS_LABEL = "Select Presidents to compare"
+METRICS_LABEL = "Select Metrics to compare"
+
+
+def president_counts(presidents):
+    # 2, 10 and "all" (the CSV has 16 presidents, a full history would have 45)
+    return sorted({min(2, len(presidents)), min(10, len(presidents)), len(presidents)})
+
+
+def interactions(at, presidents):
+    """Yield (name, action) pairs of scripted widget changes the app supports."""
+    pickers = [w for w in at.multiselect if w.label == PRESIDENTS_LABEL]
+    metric_pickers = [w for w in at.multiselect if w.label == METRICS_LABEL]
+    selects = [w for w in at.selectbox if "President" in w.label]
+
+    for count in president_counts(presidents):
+        if pickers:
+            yield (
+                f"select {count} presidents",
+                lambda at, c=count: _set_all(at.multiselect, PRESIDENTS_LABEL, presidents[:c]),
+            )
+    if selects:
+        for first, second in [(0, 1), (len(presidents) - 2, len(presidents) - 1), (1, len(presidents) // 2)]:
+            yield (
+                f"select pair {first},{second}",
+                lambda at, a=first, b=second: _set_pair(at, presidents[a], presidents[b]),
+            )
+    if metric_pickers:
+        metrics = list(aggregates.METRIC_LABELS)
+        yield "toggle all metrics", lambda at: _set_all(at.multiselect, METRICS_LABEL, metrics)
+        yield "toggle one metric", lambda at: _set_all(at.multiselect, METRICS_LABEL, metrics[:1])
+
+
+def _set_all(widgets, label, value):
+    for widget in widgets:
+        if widget.label == label:
+            widget.set_value(value)
+
+
+def _set_pair(at, first, second):
+    selects = [w for w in at.selectbox if "President" in w.label]
+    for i, widget in enumerate(selects):
+        widget.set_value(first if i % 2 == 0 else second)
+
+
+def widget_state(at):
+    return [(w, w.value) for w in list(at.multiselect) + list(at.selectbox)]
+
+
+def restore(at, state, timeout):
+    # Put the widgets back between samples so every sample is a real change.
+    for widget, value in state:
+        widget.set_value(value)
+    at.run(timeout=timeout)
+
+
+def run(at, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    error = at.exception[0].message if at.exception else None
+    return elapsed, error
+
+
+def stage_medians(app, runs):
+    """Median seconds per instrumented stage over ``runs`` reruns of ``app``."""
+    stages = {}
+    for record in runs:
+        for name, seconds in record["stages"].items():
+            stages.setdefault(name, []).append(seconds)
+    return {name: statistics.median(values) for name, values in stages.items()}
+
+
+def clear_process_caches():
+    """Forget everything a fresh server process would not have yet."""
+    dataset._datasets.clear()
+    backends._backends.clear()
+    for cache in (memo.comparisons, distributions.views, bootstrap.results, bootstrap.views):
+        cache.clear()
+    portraits._data_uris.clear()
+    portraits._failed.clear()
+
+
+def bench_app(app, scale, rows, presidents, repeat, timeout):
+    script = os.path.join(synthetic.ROOT, app)
+    records = []
+
+    def record(phase, seconds, error, interaction=None, samples=None, stages=None):
+        records.append({
+            "app": app, "scale": scale, "rows": rows, "phase": phase,
+            "interaction": interaction, "seconds": seconds, "samples": samples,
+            "stages": stages, "error": error,
+        })
+
+    def measure(at):
+        seconds, error = run(at, timeout)
+        return seconds, error, timing.last_rerun(app)
+
+    # Cold start: no snapshot on disk and nothing cached in the process.
+    shutil.rmtree(data_loader.SNAPSHOT_DIR, ignore_errors=True)
+    clear_process_caches()
+    at = AppTest.from_file(script, default_timeout=timeout)
+    seconds, error, stages = measure(at)
+    record("cold_start", seconds, error, stages=stage_medians(app, [stages] if stages else []))
+
+    # Warm start: a new process that finds the snapshot (process caches cleared).
+    clear_process_caches()
+    at = AppTest.from_file(script, default_timeout=timeout)
+    seconds, error, stages = measure(at)
+    record("warm_start", seconds, error, stages=stage_medians(app, [stages] if stages else []))
+    if error:
+        return records
+
+    runs = [measure(at) for _ in range(repeat)]
+    record("rerun", statistics.median(r[0] for r in runs), None, "no change",
+           [r[0] for r in runs], stage_medians(app, [r[2] for r in runs if r[2]]))
+
+    initial = widget_state(at)
+    for name, action in list(interactions(at, presidents)):
+        runs, error = [], None
+        for _ in range(repeat):
+            restore(at, initial, timeout)
+            action(at)
+            runs.append(measure(at))
+            error = runs[-1][1]
+            if error:
+                break
+        record("rerun", statistics.median(r[0] for r in runs), error, name,
+               [r[0] for r in runs], stage_medians(app, [r[2] for r in runs if r[2]]))
+    return records
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {
+            (r["app"], r["scale"], r["phase"], r["interaction"]): r["seconds"] for r in json.load(f)
+        }
+    regressions = []
+    for r in results:
+        before = baseline.get((r["app"], r["scale"], r["phase"], r["interaction"]))
+        if before and r["seconds"] > before * (1 + tolerance):
+            regressions.append((r, before))
+    for r, before in regressions:
+        print(f"REGRESSION {r['app']} x{r['scale']} {r['phase']} {r['interaction'] or ''}: "
+              f"{before * 1e3:.1f}ms -> {r['seconds'] * 1e3:.1f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless rerun latency for every dashboard.")
+    parser.add_argument("--apps", nargs="+", default=APPS)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--portrait-source",
+                        help="directory of portrait originals (default: none, so Prespic.py stays offline)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_loader.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+        # Collect per-stage timings in memory only.
+        timing.ENABLED, timing.SHOW_PANEL, timing.LOG_PATH = True, False, None
+        portraits.CACHE_DIR = os.path.join(tmp, "portraits")
+        portraits.SOURCE_DIR = args.portrait_source or tmp
+        for scale in args.scales:
+            rows = synthetic.base_rows() * scale
+            data_loader.CSV_PATH = synthetic.write_scaled_csv(os.path.join(tmp, f"x{scale}.csv"), rows)
+            presidents = dataset.get_dataset().presidents
+            for app in args.apps:
+                for r in bench_app(app, scale, rows, presidents, args.repeat, args.timeout):
+                    results.append(r)
+                    status = f"  ERROR: {r['error']}" if r["error"] else ""
+                    stages = " ".join(f"{k}={v * 1e3:.1f}" for k, v in (r["stages"] or {}).items())
+                    print(f"{app:<11} x{scale:<5} {r['phase']:<10} {r['interaction'] or '':<22} "
+                          f"{r['seconds'] * 1e3:9.1f}ms  {stages}{status}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import tracemalloc
+
+import synthetic
+import data_loader
+import dataset
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def allocated():
+    # Arrow-backed string columns live in Arrow's pool, not on the Python heap.
+    arrow = pyarrow.total_allocated_bytes() if pyarrow else 0
+    return tracemalloc.get_traced_memory()[0] + arrow
+
+
+def per_session_growth(open_session, sessions):
+    held = []
+    before = allocated()
+    for _ in range(sessions):
+        # Keep each session's frame alive, as a live Streamlit session would.
+        held.append(open_session())
+    return (allocated() - before) / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per simulated session: cache_data copies vs shared Dataset.")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--scale", type=int, default=1000)
+    parser.add_argument("--max-shared-bytes", type=int, default=64 * 1024,
+                        help="fail if the shared dataset costs more than this per session")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_loader.SNAPSHOT_DIR = tmp
+        path = synthetic.write_scaled_csv(os.path.join(tmp, "scaled.csv"), synthetic.base_rows() * args.scale)
+
+        tracemalloc.start()
+        df = data_loader.load_data(path)
+        size = df.memory_usage(deep=True).sum()
+        blob = pickle.dumps(df)
+
+        # What st.cache_data does on every hit: hand out a fresh unpickled copy.
+        copied = per_session_growth(lambda: pickle.loads(blob), args.sessions)
+        dataset.get_dataset(path)
+        shared = per_session_growth(lambda: dataset.get_dataset(path).frame, args.sessions)
+        tracemalloc.stop()
+
+    print(f"dataset: {len(df):,} rows, {size / 1e6:.1f} MB")
+    print(f"cache_data copy per session: {copied / 1e6:10.3f} MB")
+    print(f"shared Dataset per session:  {shared / 1e6:10.3f} MB")
+    if shared > args.max_shared_bytes:
+        print(f"FAIL: shared dataset grows {shared:,.0f} bytes per session")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
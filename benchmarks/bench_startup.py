@@ -0,0 +1,123 @@
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import synthetic
+import st_client
+
+# Cold-start budget for the dashboards.
+#
+# For every app the module-level imports are run in a fresh interpreter under
+# `python -X importtime`, --repeat times. What counts against the budget is
+# the median import time minus that of a bare `import streamlit` (plus the
+# interpreter's own startup imports), which every script pays and no app can
+# avoid. Separately, the libraries in LAZY must not be imported at all before
+# a chart asks for them (beyond whatever streamlit itself imports), however
+# fast the machine is.
+#
+# With --server, each app is also started as a real `streamlit run` server
+# and the first session reports when the first element (the title) arrived
+# and when the first run finished. The apps draw their title before loading
+# the data, so a fresh worker has a page up while it reads the CSV.
+#
+# Exits 1 when an app is over budget or imports a LAZY library.
+
+APPS = ["AZ.py", "app2.py", "Fud.py", "Prespic.py", "WHA.py"]
+BUDGET_MS = float(os.environ.get("P4_IMPORT_BUDGET_MS", "700"))
+LAZY = ["altair", "plotly.express", "duckdb", "vl_convert", "matplotlib", "seaborn"]
+
+_REPORT = "import sys; print(sorted(sys.modules))"
+
+
+def module_imports(app):
+    """Return the source of ``app``'s module-level import statements."""
+    with open(os.path.join(synthetic.ROOT, app)) as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def import_profile(source):
+    """Run ``source`` under -X importtime; return ({top-level module: ms}, modules loaded)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{source}\n{_REPORT}"],
+        cwd=synthetic.ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # nested imports are indented further
+            times[name.strip()] = times.get(name.strip(), 0) + int(cumulative) / 1000
+    return times, set(ast.literal_eval(result.stdout.splitlines()[-1]))
+
+
+def lazy_loaded(modules, baseline):
+    return sorted(m for m in modules - baseline if m in LAZY)
+
+
+def server_cold_start(app, env):
+    with st_client.serve(app, env=env) as (url, _):
+        session = st_client.Session(url)
+        try:
+            seconds, _, error = session.rerun()
+            return session.first_element, seconds, error
+        finally:
+            session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget for the dashboards.")
+    parser.add_argument("--apps", nargs="+", choices=APPS, default=APPS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS,
+                        help="max ms of imports on top of streamlit (P4_IMPORT_BUDGET_MS)")
+    parser.add_argument("--server", action="store_true", help="also time a cold `streamlit run`")
+    args = parser.parse_args()
+
+    baseline_runs = [import_profile("import streamlit") for _ in range(args.repeat)]
+    streamlit_ms = statistics.median(sum(times.values()) for times, _ in baseline_runs)
+    streamlit_only = statistics.median(times["streamlit"] for times, _ in baseline_runs)
+    baseline = set.union(*(modules for _, modules in baseline_runs))
+    print(f"import streamlit: {streamlit_only:.0f} ms, interpreter startup: {streamlit_ms - streamlit_only:.0f} ms (not counted)\n")
+    print(f"{'app':<11} {'imports ms':>10} {'budget':>7}  slowest imports")
+
+    failures = []
+    for app in args.apps:
+        runs = [import_profile(module_imports(app)) for _ in range(args.repeat)]
+        own = statistics.median(sum(times.values()) for times, _ in runs) - streamlit_ms
+        baseline_names = set(baseline_runs[-1][0])
+        slowest = sorted(runs[-1][0].items(), key=lambda item: -item[1])
+        slowest = ", ".join([f"{name} {ms:.0f}" for name, ms in slowest if name not in baseline_names][:4])
+        loaded = lazy_loaded(set.union(*(modules for _, modules in runs)), baseline)
+        status = "ok" if own <= args.budget_ms else "OVER"
+        print(f"{app:<11} {own:10.0f} {status:>7}  {slowest}")
+        if own > args.budget_ms:
+            failures.append(f"{app}: {own:.0f} ms of imports, budget {args.budget_ms:.0f} ms")
+        if loaded:
+            failures.append(f"{app}: imports {', '.join(loaded)} before any chart is drawn")
+
+    if args.server:
+        print(f"\n{'app':<11} {'title ms':>9} {'first run ms':>13}")
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                "P4_SNAPSHOT_DIR": os.path.join(tmp, "snapshots"),
+                "P4_PORTRAIT_CACHE": os.path.join(tmp, "portraits"),
+                "P4_PORTRAIT_SOURCE": tmp,  # offline: placeholders, no downloads
+                "P4_WATCH_INTERVAL": "0",
+            }
+            for app in args.apps:
+                first, seconds, error = server_cold_start(app, env)
+                print(f"{app:<11} {first * 1e3:9.0f} {seconds * 1e3:13.0f}" + (f"  {error}" if error else ""))
+
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
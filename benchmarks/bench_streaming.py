@@ -0,0 +1,108 @@
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import synthetic
+import aggregates
+import data_loader
+import streaming
+
+# Peak memory of the whole-file load against the chunked ingest.
+#
+# Each mode runs in a fresh interpreter so its peak RSS is its own (VmHWM;
+# ru_maxrss would carry over the parent's peak across fork/exec). The
+# whole-file load grows with the file; the streamed ingest should stay flat
+# at one chunk. The streamed cube is also checked against build_cube() on
+# the fully loaded frame; a mismatch exits 1. A last row repeats the smallest
+# file with one long malformed Debt cell, which must not raise the streamed
+# peak by more than LONG_CELL_SLACK.
+
+LONG_CELL = "garbage " * 375
+LONG_CELL_SLACK = 1.5
+
+
+def child(mode, path, chunk_rows):
+    start = time.perf_counter()
+    if mode == "full":
+        cube = aggregates.build_cube(data_loader.parse_csv(path))
+    else:
+        cube = streaming.stream_cube(path, chunk_rows)
+    seconds = time.perf_counter() - start
+    cube.index = cube.index.astype(str)
+    cube.to_pickle(f"{path}.{mode}.pkl")
+    with open("/proc/self/status") as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    print(json.dumps({"seconds": seconds, "peak_mb": peak_kb / 1024}))
+
+
+def with_long_bad_cell(source, target):
+    """Copy the CSV at ``source`` to ``target`` with LONG_CELL as the first row's Debt."""
+    with open(source, newline="") as f:
+        rows = list(csv.reader(f))
+    rows[1][rows[0].index("Debt")] = LONG_CELL
+    with open(target, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+    return target
+
+
+def run(mode, path, chunk_rows):
+    output = subprocess.check_output(
+        [sys.executable, __file__, "--child", mode, path, "--chunk-rows", str(chunk_rows)]
+    )
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of whole-file vs chunked ingest.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--chunk-rows", type=int, default=streaming.CHUNK_ROWS)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child, args.chunk_rows)
+        return
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>12} {'file MB':>8} {'full MB':>8} {'full s':>7} {'stream MB':>10} {'stream s':>9}")
+        for scale in args.scales:
+            rows = synthetic.base_rows() * scale
+            path = synthetic.write_scaled_csv(os.path.join(tmp, f"x{scale}.csv"), rows)
+            full = run("full", path, args.chunk_rows)
+            streamed = run("stream", path, args.chunk_rows)
+            try:
+                pd.testing.assert_frame_equal(
+                    pd.read_pickle(f"{path}.stream.pkl"), pd.read_pickle(f"{path}.full.pkl").astype(float),
+                    check_exact=False, rtol=1e-9, check_names=False,
+                )
+                status = ""
+            except AssertionError as e:
+                failed = True
+                status = f"  MISMATCH: {e}"
+            print(f"{rows:>12,} {os.path.getsize(path) / 2**20:8.1f} {full['peak_mb']:8.0f} "
+                  f"{full['seconds']:7.2f} {streamed['peak_mb']:10.0f} {streamed['seconds']:9.2f}{status}")
+            if scale == args.scales[0]:
+                baseline, long_path = streamed, with_long_bad_cell(path, os.path.join(tmp, "long.csv"))
+            os.remove(path)
+
+        full = run("full", long_path, args.chunk_rows)
+        streamed = run("stream", long_path, args.chunk_rows)
+        status = ""
+        if streamed["peak_mb"] > baseline["peak_mb"] * LONG_CELL_SLACK:
+            failed = True
+            status = f"  OVER: {baseline['peak_mb']:.0f} MB without the long cell"
+        print(f"{'+ long cell':>12} {os.path.getsize(long_path) / 2**20:8.1f} {full['peak_mb']:8.0f} "
+              f"{full['seconds']:7.2f} {streamed['peak_mb']:10.0f} {streamed['seconds']:9.2f}{status}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import time
+
+import synthetic
+from term_index import TermIndex
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def check(df, index):
+    # Every president's rows and every year window must match the boolean scan.
+    for president in index.presidents:
+        expected = df[df["President"] == president]
+        assert index.rows(president).equals(expected), president
+    years = df["date"].unique()
+    first, last = years[len(years) // 4], years[len(years) // 2]
+    expected = df[(df["date"] >= first) & (df["date"] <= last)]
+    assert index.years(first, last).equals(expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TermIndex lookups against boolean masks.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    base_rows = synthetic.base_rows()
+    print(f"{'rows':>10} {'build':>9} {'mask/pres':>10} {'index/pres':>11} {'mask/years':>11} {'index/years':>12}")
+    for scale in args.scales:
+        df = synthetic.scaled_clean(base_rows * scale)
+        # Hand Hoover's first year to Roosevelt's successor to get a
+        # non-consecutive "Grover Cleveland" style president in the data.
+        df.loc[df["date"] == 1931, "President"] = "Harry S. Truman"
+
+        start = time.perf_counter()
+        index = TermIndex(df)
+        build = time.perf_counter() - start
+        check(df, index)
+
+        president, first, last = "Ronald Reagan", 1960, 1990
+        mask_pres = timed(lambda: df[df["President"] == president], args.repeat)
+        index_pres = timed(lambda: index.rows(president), args.repeat)
+        mask_years = timed(lambda: df[(df["date"] >= first) & (df["date"] <= last)], args.repeat)
+        index_years = timed(lambda: index.years(first, last), args.repeat)
+        print(
+            f"{len(df):>10,} {build * 1e3:>7.2f}ms {mask_pres * 1e3:>8.3f}ms {index_pres * 1e3:>9.3f}ms"
+            f" {mask_years * 1e3:>9.3f}ms {index_years * 1e3:>10.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import synthetic
+import st_client
+import timing
+
+try:
+    import psutil
+except ImportError:  # optional: fall back to /proc on Linux
+    psutil = None
+
+# How many simultaneous viewers one server can take.
+#
+# For each user count a fresh `streamlit run` server is started and that many
+# websocket sessions (benchmarks/st_client.py) connect at once. Each session
+# makes --changes selection changes with a pause between them: presidents are
+# drawn with Zipf-like popularity, so popular pairs repeat across sessions the
+# way real traffic does. Every session has its own generator seeded from
+# --seed, so two runs replay exactly the same clicks.
+#
+# Between changes a session idles like an open tab: watcher.follow's version
+# check reruns its fragment every --watch-interval seconds (P4_WATCH_INTERVAL,
+# 0 = off). Those polls are timed separately from the viewer's reruns.
+#
+# Reported per user count: p50/p95/p99 rerun latency, polls and their p50
+# latency, server RSS growth per session and the server's CPU use (100% =
+# one core busy).
+
+APPS = ["AZ.py", "app2.py", "Fud.py", "Prespic.py", "WHA.py"]
+SAMPLE_INTERVAL = 0.25
+
+
+def _proc_usage(pid):
+    if psutil is not None:
+        process = psutil.Process(pid)
+        times = process.cpu_times()
+        return process.memory_info().rss, times.user + times.system
+    with open(f"/proc/{pid}/status") as f:
+        rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    ticks = os.sysconf("SC_CLK_TCK")
+    return rss, (int(fields[11]) + int(fields[12])) / ticks
+
+
+class Sampler(threading.Thread):
+    """Samples the server's RSS and CPU use until stopped."""
+
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.cpu = []
+        self.rss = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        last_rss, last_cpu = _proc_usage(self.pid)
+        last_time = time.perf_counter()
+        while not self._stop_event.wait(SAMPLE_INTERVAL):
+            rss, cpu = _proc_usage(self.pid)
+            now = time.perf_counter()
+            self.cpu.append((cpu - last_cpu) / (now - last_time))
+            self.rss.append(rss)
+            last_cpu, last_time = cpu, now
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def choose(widget, rng, weights):
+    """Pick a new value for ``widget`` the way a viewer might."""
+    options = widget.options
+    if widget.kind == "selectbox":
+        return options[rng.choice(len(options), p=weights(len(options)))]
+    if widget.kind == "multiselect":
+        count = min(len(options), int(rng.integers(1, 5)))
+        picked = rng.choice(len(options), size=count, replace=False, p=weights(len(options)))
+        return [options[i] for i in sorted(picked)]
+    return None
+
+
+def zipf_weights(n):
+    weights = 1.0 / np.arange(1, n + 1)
+    return weights / weights.sum()
+
+
+def user(url, seed, changes, think, latencies, polls, errors, ready, go):
+    rng = np.random.default_rng(seed)
+    try:
+        session = st_client.Session(url)
+    except Exception as e:  # connection refused, handshake timeout, ...
+        errors.append(f"connect: {e}")
+        ready.release()
+        return
+    try:
+        ready.release()
+        go.wait()
+        seconds, _, error = session.rerun()
+        latencies.append(seconds)
+        widgets = [w for w in session.widgets.values() if w.kind in ("selectbox", "multiselect")]
+        for _ in range(changes if widgets else 0):
+            for seconds, _, error in session.wait(rng.exponential(think)):
+                if error:
+                    errors.append(error)
+                polls.append(seconds)
+            widget = widgets[rng.integers(len(widgets))]
+            seconds, _, error = session.set(widget.label, choose(widget, rng, zipf_weights))
+            if error:
+                errors.append(error)
+            latencies.append(seconds)
+    except Exception as e:
+        errors.append(str(e))
+    finally:
+        session.close()
+
+
+def run_level(app, users, args, env):
+    with st_client.serve(app, env=env) as (url, process):
+        # One warm-up session loads the data, so RSS growth after it is per session.
+        warmup = st_client.Session(url)
+        warmup.rerun()
+        warmup.close()
+        base_rss, _ = _proc_usage(process.pid)
+
+        latencies, polls, errors = [], [], []
+        ready, go = threading.Semaphore(0), threading.Event()
+        threads = [
+            threading.Thread(target=user, args=(url, args.seed + i, args.changes, args.think,
+                                                latencies, polls, errors, ready, go))
+            for i in range(users)
+        ]
+        for thread in threads:
+            thread.start()
+        for _ in threads:
+            ready.acquire()
+
+        sampler = Sampler(process.pid)
+        sampler.start()
+        start = time.perf_counter()
+        go.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+
+    peak_rss = max(sampler.rss, default=base_rss)
+    return {
+        "app": app, "users": users, "seed": args.seed, "reruns": len(latencies),
+        "errors": len(errors), "first_error": errors[0] if errors else None,
+        "p50": timing.percentile(latencies, 0.50),
+        "p95": timing.percentile(latencies, 0.95),
+        "p99": timing.percentile(latencies, 0.99),
+        "throughput": len(latencies) / elapsed,
+        "polls": len(polls),
+        "poll_p50": timing.percentile(polls, 0.50),
+        "rss_base_mb": base_rss / 2**20,
+        "rss_per_session_kb": (peak_rss - base_rss) / users / 1024,
+        "cpu_mean": statistics.fmean(sampler.cpu) if sampler.cpu else 0.0,
+        "cpu_max": max(sampler.cpu, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated concurrent viewers against a local server.")
+    parser.add_argument("--app", choices=APPS, default="Fud.py")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--changes", type=int, default=20, help="selection changes per session")
+    parser.add_argument("--think", type=float, default=0.5, help="mean pause between changes (s)")
+    parser.add_argument("--watch-interval", type=float, default=5.0,
+                        help="seconds between each session's version checks (0 = off)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=int, default=1, help="rows = base rows x scale")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "P4_SNAPSHOT_DIR": os.path.join(tmp, "snapshots"),
+            "P4_PORTRAIT_CACHE": os.path.join(tmp, "portraits"),
+            "P4_PORTRAIT_SOURCE": tmp,  # offline: placeholders, no downloads
+            "P4_WATCH_INTERVAL": str(args.watch_interval),
+        }
+        if args.scale > 1:
+            env["P4_CSV_PATH"] = synthetic.write_scaled_csv(
+                os.path.join(tmp, "data.csv"), synthetic.base_rows() * args.scale)
+
+        print(f"{'app':<11} {'users':>5} {'reruns':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'rerun/s':>8} {'polls':>6} {'poll ms':>8} {'KB/sess':>8} {'cpu avg':>8} {'cpu max':>8}")
+        for users in args.users:
+            r = run_level(args.app, users, args, env)
+            results.append(r)
+            status = f"  {r['errors']} errors: {r['first_error']}" if r["errors"] else ""
+            print(f"{r['app']:<11} {users:>5} {r['reruns']:>6} {r['p50'] * 1e3:8.1f} {r['p95'] * 1e3:8.1f} "
+                  f"{r['p99'] * 1e3:8.1f} {r['throughput']:8.1f} {r['polls']:>6} {r['poll_p50'] * 1e3:8.1f} "
+                  f"{r['rss_per_session_kb']:8.0f} "
+                  f"{r['cpu_mean']:8.0%} {r['cpu_max']:8.0%}{status}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.sync.client import connect
+
+import synthetic
+
+# A headless stand-in for the browser.
+#
+# AppTest always reruns the whole script, so anything that depends on what
+# the frontend sends (fragment reruns, bytes on the wire, many concurrent
+# sessions) is measured against a real `streamlit run` server instead. The
+# client speaks the same protobuf-over-websocket protocol as the browser:
+# it sends BackMsg.rerun_script with the widget states and reads ForwardMsgs
+# until script_finished. Fragments with run_every (watcher.follow's version
+# check) announce themselves with auto_rerun; wait() reruns them on their
+# timer the way an idle tab does.
+
+WIDGET_VALUE_FIELDS = {
+    "multiselect": "string_array_value",
+    "selectbox": "string_value",
+    "checkbox": "bool_value",
+    "slider": "double_array_value",
+    "radio": "string_value",
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(app, env=None, port=None, timeout=60):
+    """Run ``streamlit run app`` headless and yield (base URL, server process)."""
+    port = port or free_port()
+    command = [
+        sys.executable, "-m", "streamlit", "run", os.path.join(synthetic.ROOT, app),
+        "--server.headless=true", f"--server.port={port}", "--server.address=127.0.0.1",
+        "--server.enableXsrfProtection=false", "--browser.gatherUsageStats=false",
+        "--server.fileWatcherType=none",
+    ]
+    process = subprocess.Popen(
+        command, cwd=synthetic.ROOT, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                urllib.request.urlopen(f"{url}/_stcore/health", timeout=1).read()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"streamlit did not start for {app}")
+                time.sleep(0.2)
+        yield url, process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class Widget:
+    def __init__(self, kind, element, fragment_id):
+        self.kind = kind
+        self.id = element.id
+        self.label = element.label
+        self.options = list(getattr(element, "options", []))
+        self.fragment_id = fragment_id
+
+
+class Session:
+    """One browser tab: a websocket plus the widget values it has set."""
+
+    def __init__(self, url, timeout=60):
+        self.timeout = timeout
+        self.ws = connect(
+            url.replace("http", "ws", 1) + "/_stcore/stream",
+            subprotocols=["streamlit"], max_size=None, open_timeout=timeout,
+        )
+        self.widgets = {}
+        self.values = {}
+        # fragment id -> seconds; the browser reruns these fragments on a timer
+        self.auto_reruns = {}
+        # fragment id -> time.monotonic() of its next timed rerun
+        self._due = {}
+        # Seconds from sending the last rerun to its first delta
+        self.first_element = None
+
+    def close(self):
+        self.ws.close()
+
+    def widget(self, label):
+        # Newest first: a widget whose options change comes back with a new id.
+        for widget in reversed(list(self.widgets.values())):
+            if widget.label == label:
+                return widget
+        raise KeyError(label)
+
+    def wait(self, seconds):
+        """Idle for ``seconds``, rerunning timed fragments as they come due.
+
+        Returns (seconds, bytes received, error) for each of those reruns.
+        """
+        deadline = time.monotonic() + seconds
+        reruns = []
+        while True:
+            fragment_id, due = min(self._due.items(), key=lambda item: item[1], default=(None, deadline))
+            if due >= deadline:
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                return reruns
+            time.sleep(max(0.0, due - time.monotonic()))
+            self._due[fragment_id] = due + self.auto_reruns[fragment_id]
+            reruns.append(self.rerun(fragment_id))
+
+    def rerun(self, fragment_id=""):
+        """Send a rerun and wait for it; return (seconds, bytes received, error)."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.fragment_id = fragment_id
+        for widget_id, (field, value) in self.values.items():
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            if field.endswith("_array_value"):
+                getattr(state, field).data.extend(value)
+            else:
+                setattr(state, field, value)
+
+        if not fragment_id:
+            # A full run registers its timed fragments again.
+            self.auto_reruns.clear()
+            self._due.clear()
+        self.first_element = None
+        start = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        received, error = 0, None
+        while True:
+            data = self.ws.recv(timeout=self.timeout)
+            received += len(data)
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta":
+                if self.first_element is None:
+                    self.first_element = time.perf_counter() - start
+                self._track(forward.delta)
+            elif kind == "auto_rerun":
+                fragment = forward.auto_rerun.fragment_id
+                self.auto_reruns[fragment] = forward.auto_rerun.interval
+                self._due.setdefault(fragment, time.monotonic() + forward.auto_rerun.interval)
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    error = "compile error"
+                break
+        return time.perf_counter() - start, received, error
+
+    def _track(self, delta):
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            raise RuntimeError(element.exception.message)
+        if kind in WIDGET_VALUE_FIELDS:
+            widget = Widget(kind, getattr(element, kind), delta.fragment_id)
+            self.widgets[widget.id] = widget
+
+    def set(self, label, value, fragment=True):
+        """Change a widget like a user would and rerun what the browser would rerun.
+
+        With ``fragment=False`` the whole page reruns even for a widget inside
+        a fragment, which is what the page cost before it had fragments.
+        """
+        widget = self.widget(label)
+        self.values[widget.id] = (WIDGET_VALUE_FIELDS[widget.kind], value)
+        return self.rerun(widget.fragment_id if fragment else "")
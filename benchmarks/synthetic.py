@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Benchmarks are run as scripts (python benchmarks/<name>.py), so make the
+# repo root importable for data_loader and friends.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import data_loader  # noqa: E402
+
+
+def base_rows(path=data_loader.CSV_PATH):
+    with open(path, "rb") as f:
+        return sum(1 for _ in f) - 1
+
+
+def scaled_raw(rows, path=data_loader.CSV_PATH):
+    """Return `rows` rows of the raw (unparsed) CSV, scaled up from the real file.
+
+    Every source row is repeated in place, like a monthly/quarterly series, so
+    the result stays date-sorted and each president keeps a contiguous run.
+    """
+    raw = pd.read_csv(path, dtype={c: object for c in data_loader.CURRENCY_COLUMNS})
+    positions = np.floor(np.linspace(0, len(raw), rows, endpoint=False)).astype(int)
+    return raw.iloc[positions].reset_index(drop=True)
+
+
+def scaled_clean(rows, path=data_loader.CSV_PATH):
+    return data_loader.clean_data(scaled_raw(rows, path))
+
+
+def write_scaled_csv(target, rows, path=data_loader.CSV_PATH):
+    scaled_raw(rows, path).to_csv(target, index=False)
+    return target
@@ -0,0 +1,191 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+import charts
+import memo
+import term_metrics
+
+# Bootstrap confidence intervals and permutation tests for president comparisons.
+#
+# A president has only a handful of yearly rows per metric, so two bars of
+# means can differ by chance alone. For every selected president and metric
+# compare() resamples the rows with replacement to get a percentile interval
+# of the mean, and for every pair it shuffles the pooled rows to get a
+# two-sided permutation p-value for the difference of means.
+#
+# Resampling is vectorized: each block of resamples is one integer index
+# matrix (or one Generator.permuted call), capped at BLOCK_CELLS values.
+# Every task gets its own generator seeded from P4_SEED and the president
+# and metric names, so results are the same whichever selection, process or
+# order computed them. That makes each task cacheable on its own: a new
+# selection only computes the presidents and pairs it adds. Selections with
+# at least PARALLEL_TASKS uncached tasks are fanned out over a process pool.
+
+RESAMPLES = int(os.environ.get("P4_RESAMPLES", "2000"))
+SEED = int(os.environ.get("P4_SEED", "0"))
+LEVEL = 0.95
+WORKERS = int(os.environ.get("P4_STATS_WORKERS", "0")) or os.cpu_count() or 1
+PARALLEL_TASKS = 64
+BLOCK_CELLS = 1 << 20
+
+results = memo.LRUMemo(maxsize=8192)
+views = memo.LRUMemo()
+
+logger = logging.getLogger(__name__)
+
+_pool_lock = threading.Lock()
+_pool = None
+
+
+def _rng(seed, *names):
+    # crc32 rather than hash(): str hashes differ between processes.
+    return np.random.default_rng([seed, *(zlib.crc32(str(name).encode()) for name in names)])
+
+
+def _blocks(resamples, width):
+    step = max(1, BLOCK_CELLS // max(width, 1))
+    for start in range(0, resamples, step):
+        yield start, min(start + step, resamples)
+
+
+def bootstrap_interval(values, resamples=RESAMPLES, rng=None, level=LEVEL):
+    """Return ``(mean, low, high)``: the percentile bootstrap interval of the mean of ``values``."""
+    values = np.asarray(values, dtype="float64")
+    if len(values) == 0:
+        return np.nan, np.nan, np.nan
+    rng = rng if rng is not None else np.random.default_rng(SEED)
+    means = np.empty(resamples)
+    for start, stop in _blocks(resamples, len(values)):
+        picks = rng.integers(0, len(values), size=(stop - start, len(values)))
+        means[start:stop] = values[picks].mean(axis=1)
+    low, high = np.quantile(means, [(1 - level) / 2, (1 + level) / 2])
+    return values.mean(), low, high
+
+
+def permutation_pvalue(a, b, resamples=RESAMPLES, rng=None):
+    """Return ``(mean(a) - mean(b), two-sided permutation p-value)``."""
+    a = np.asarray(a, dtype="float64")
+    b = np.asarray(b, dtype="float64")
+    if len(a) == 0 or len(b) == 0:
+        return np.nan, np.nan
+    rng = rng if rng is not None else np.random.default_rng(SEED)
+    difference = a.mean() - b.mean()
+    # Shuffled differences within rounding of the observed one count as
+    # at least as extreme.
+    observed = abs(difference) * (1 - 1e-9)
+    pooled = np.concatenate([a, b])
+    extreme = 0
+    for start, stop in _blocks(resamples, len(pooled)):
+        shuffled = rng.permuted(np.broadcast_to(pooled, (stop - start, len(pooled))), axis=1)
+        shuffled_difference = shuffled[:, :len(a)].mean(axis=1) - shuffled[:, len(a):].mean(axis=1)
+        extreme += np.count_nonzero(np.abs(shuffled_difference) >= observed)
+    return difference, (extreme + 1) / (resamples + 1)
+
+
+def _run(task):
+    """Compute one cache entry; runs in the pool workers too."""
+    kind, names, arrays, resamples, seed, level = task
+    rng = _rng(seed, kind, *names)
+    if kind == "interval":
+        return bootstrap_interval(arrays[0], resamples, rng, level)
+    return permutation_pvalue(arrays[0], arrays[1], resamples, rng)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the Streamlit server is multi-threaded.
+            _pool = ProcessPoolExecutor(WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _compute(tasks, parallel):
+    global _pool
+    if parallel and len(tasks) >= PARALLEL_TASKS and WORKERS > 1:
+        chunksize = max(1, len(tasks) // (WORKERS * 4))
+        pool = _get_pool()
+        try:
+            return list(pool.map(_run, tasks, chunksize=chunksize))
+        except BrokenProcessPool:
+            # A worker died (killed, out of memory): start a new pool next
+            # time and finish this selection here.
+            logger.exception("statistics pool failed, computing in-process")
+            with _pool_lock:
+                if _pool is pool:
+                    _pool = None
+    return [_run(task) for task in tasks]
+
+
+def compare(dataset, presidents, metrics, resamples=RESAMPLES, seed=SEED, level=LEVEL, parallel=True):
+    """Return ``(intervals, tests)`` for the selection.
+
+    ``intervals`` has one row per president and metric (President, Metric,
+    Mean, Low, High); ``tests`` one row per pair of presidents and metric
+    (Metric, President A, President B, Difference, p-value), where Difference
+    is mean(A) - mean(B) and A comes first in ``presidents``. ``dataset`` is a
+    Dataset or a backend; the rows come from one rows_by_president() call.
+    """
+    presidents = list(dict.fromkeys(presidents))
+    metrics = list(metrics)
+    pairs = list(itertools.combinations(presidents, 2))
+    rows = {}
+
+    def values(president, metric):
+        column = rows[president][metric].to_numpy(dtype="float64", na_value=np.nan)
+        return column[~np.isnan(column)]
+
+    keys = [("interval", dataset.version, (p,), m, resamples, seed, level) for m in metrics for p in presidents]
+    # Pairs are cached in name order; the sign of the difference is fixed up below.
+    keys += [("test", dataset.version, tuple(sorted(pair)), m, resamples, seed, None) for m in metrics for pair in pairs]
+
+    def compute(missing):
+        # The missing presidents' rows are fetched together: the streaming
+        # backend reads the whole file per call.
+        rows.update(dataset.rows_by_president(dict.fromkeys(name for key in missing for name in key[2])))
+        tasks = [
+            (kind, (*names, metric), [values(name, metric) for name in names], resamples, seed, level)
+            for kind, _, names, metric, _, _, _ in missing
+        ]
+        return _compute(tasks, parallel)
+
+    found = results.get_many(keys, compute)
+
+    intervals = pd.DataFrame(
+        [(p, m, *found[("interval", dataset.version, (p,), m, resamples, seed, level)])
+         for m in metrics for p in presidents],
+        columns=["President", "Metric", "Mean", "Low", "High"],
+    )
+    tests = []
+    for m in metrics:
+        for a, b in pairs:
+            difference, p_value = found[("test", dataset.version, tuple(sorted((a, b))), m, resamples, seed, None)]
+            tests.append((m, a, b, difference if a < b else -difference, p_value))
+    tests = pd.DataFrame(tests, columns=["Metric", "President A", "President B", "Difference", "p-value"])
+    tests["Difference"] += 0.0  # flipping a zero difference gives -0.0, shown as "-0.00"
+    return intervals, tests
+
+
+def statistics_view(dataset, presidents, metrics, width=200, height=400):
+    """Return ``(intervals, tests, chart_spec)`` with display labels, shared across sessions."""
+    presidents = list(dict.fromkeys(presidents))
+    metrics = tuple(metrics)
+    key = (dataset.version, tuple(presidents), metrics, width, height, RESAMPLES, SEED)
+
+    def build():
+        intervals, tests = compare(dataset, presidents, metrics)
+        intervals["Metric"] = intervals["Metric"].map(lambda m: term_metrics.METRIC_LABELS.get(m, m))
+        tests["Metric"] = tests["Metric"].map(lambda m: term_metrics.METRIC_LABELS.get(m, m))
+        spec = charts.interval_chart(intervals, width=width, height=height).to_dict()
+        return intervals, tests, spec
+
+    return views.get(key, build)
@@ -0,0 +1,107 @@
+import json
+import os
+
+# Altair chart definitions shared by the dashboards.
+#
+# altair takes a quarter of a second to import, so each function imports it
+# when a chart is first built rather than when a dashboard starts.
+
+# Default for the apps' "Filter in the browser" switch.
+CLIENT_SIDE = os.environ.get("P4_CLIENT_SIDE", "") == "1"
+
+
+def comparison_chart(comparison_df, presidents, width=200, height=400):
+    """Bar chart of a comparison_frame(): one bar per president in each metric's column."""
+    import altair as alt
+
+    # Melt here rather than with transform_fold: Vega reads the dots in
+    # names like "Franklin D. Roosevelt" as nested field access and drops them.
+    long_df = comparison_df.melt(
+        id_vars="Metric", value_vars=list(dict.fromkeys(presidents)),
+        var_name="President", value_name="Value",
+    )
+    return alt.Chart(long_df).mark_bar().encode(
+        x=alt.X('Metric:N', axis=alt.Axis(title='Metric')),
+        y=alt.Y('Value:Q', axis=alt.Axis(title='Value')),
+        color='President:N',
+        column='Metric:N'
+    ).properties(
+        width=width,
+        height=height
+    )
+
+
+def interactive_comparison_chart(long_df, presidents, metrics, selected_presidents=(),
+                                 selected_metrics=(), width=200, height=400):
+    """Comparison chart that filters in the browser instead of rerunning Python.
+
+    ``long_df`` is aggregates.long_frame() for every president and metric.
+    Presidents are picked by clicking the legend (shift-click for several;
+    nothing picked shows everyone) and metrics with checkboxes under the
+    chart, so changing the selection never round-trips to the server.
+    """
+    import altair as alt
+
+    president_pick = alt.selection_point(
+        name="presidents",
+        fields=["President"],
+        bind="legend",
+        value=[{"President": p} for p in selected_presidents] or alt.Undefined,
+    )
+    metric_toggles = [
+        alt.param(
+            name=f"show_metric_{i}",
+            value=metric in selected_metrics,
+            bind=alt.binding_checkbox(name=f"{metric} "),
+        )
+        for i, metric in enumerate(metrics)
+    ]
+    shown_metric = " || ".join(
+        f"(datum.Metric === {json.dumps(metric)} && show_metric_{i})"
+        for i, metric in enumerate(metrics)
+    )
+
+    return alt.Chart(long_df).mark_bar().encode(
+        x=alt.X('Metric:N', axis=alt.Axis(title='Metric')),
+        y=alt.Y('Value:Q', axis=alt.Axis(title='Value')),
+        # A fixed domain keeps every president in the legend while filtered out.
+        color=alt.Color('President:N', scale=alt.Scale(domain=list(presidents))),
+        column='Metric:N'
+    ).add_params(
+        president_pick, *metric_toggles
+    ).transform_filter(
+        shown_metric
+    ).transform_filter(
+        president_pick
+    ).properties(
+        width=width,
+        height=height
+    )
+
+
+def interval_chart(intervals, width=200, height=400):
+    """Mean bars with confidence-interval error bars, one panel per metric.
+
+    ``intervals`` is the first frame of bootstrap.compare(). Each panel has
+    its own y scale so a metric's interval is not flattened by a larger one.
+    """
+    import altair as alt
+
+    base = alt.Chart().encode(x=alt.X('President:N', axis=alt.Axis(title=None, labels=False)))
+    bars = base.mark_bar().encode(
+        y=alt.Y('Mean:Q', axis=alt.Axis(title='Value')),
+        color='President:N',
+        tooltip=['President', 'Metric', 'Mean', 'Low', 'High'],
+    )
+    errors = base.mark_errorbar(ticks=True).encode(
+        y=alt.Y('Low:Q', title='Value'),
+        y2='High:Q',
+    )
+    return alt.layer(bars, errors, data=intervals).properties(
+        width=width,
+        height=height
+    ).facet(
+        column='Metric:N'
+    ).resolve_scale(
+        y='independent'
+    )
@@ -0,0 +1,118 @@
+import functools
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import data_loader
+import term_metrics
+from term_index import TermIndex
+
+# One read-only copy of the dataset per process.
+#
+# st.cache_data pickles its result and hands every session a fresh copy, so
+# memory grows with the number of viewers. get_dataset() instead keeps a
+# single Dataset per CSV in a module-level cache (modules are imported once
+# per Streamlit process) and every session reads the same buffers. Numeric
+# buffers are marked read-only and sessions only ever get shallow copies, so
+# no session can change what another one sees.
+
+
+def freeze(df):
+    """Return a frame over read-only copies of ``df``'s numpy buffers."""
+    columns = {}
+    for name in df.columns:
+        values = df[name].array
+        if isinstance(df[name].dtype, np.dtype):
+            values = np.array(df[name].to_numpy(), copy=True)
+            values.flags.writeable = False
+        columns[name] = values
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    frozen.columns = df.columns
+    return frozen
+
+
+class Dataset:
+    def __init__(self, frame, version):
+        self._frame = freeze(frame)
+        self.version = version
+        # Built with the data, so the first rows/years lookup is already a slice.
+        self.term_index = TermIndex(self._frame)
+
+    @classmethod
+    def appended(cls, previous, frame, version, start):
+        """Return the Dataset for ``frame``, which is ``previous``'s rows plus rows ``start:``.
+
+        The aggregate cube is carried over and only the presidents in the new
+        rows are recomputed.
+        """
+        dataset = cls(frame, version)
+        if "_cube" in previous.__dict__:
+            dataset.__dict__["_cube"] = freeze(aggregates.update_cube(previous._cube, dataset._frame, start))
+        return dataset
+
+    @property
+    def frame(self):
+        # Shallow copy: shares the read-only buffers, but adding or replacing
+        # columns only affects the caller's copy.
+        return self._frame.copy(deep=False)
+
+    @functools.cached_property
+    def _cube(self):
+        return freeze(aggregates.build_cube(self._frame))
+
+    @functools.cached_property
+    def _term_metrics(self):
+        return freeze(term_metrics.build_term_metrics(self._frame))
+
+    # The aggregates are shared like the frame: read-only buffers, and every
+    # caller gets its own shallow copy.
+    @property
+    def cube(self):
+        return self._cube.copy(deep=False)
+
+    @property
+    def term_metrics(self):
+        return self._term_metrics.copy(deep=False)
+
+    @property
+    def presidents(self):
+        return self._cube.index.tolist()
+
+    def rows(self, president, first=None, last=None):
+        return self.term_index.rows(president, first, last)
+
+    def rows_by_president(self, presidents, first=None, last=None):
+        """Return ``{president: rows}`` for ``presidents``."""
+        return {president: self.rows(president, first, last) for president in presidents}
+
+
+_lock = threading.Lock()
+_datasets = {}
+
+
+def get_dataset(path=None):
+    """Return the process-wide Dataset for ``path``, reloading it if the file changed.
+
+    ``path`` defaults to data_loader.CSV_PATH as it is at call time.
+    """
+    path = path or data_loader.CSV_PATH
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _datasets.get(path)
+        if cached is None or cached[0] != key:
+            df, version = data_loader.load_versioned(path)
+            if cached is not None and cached[1].version == version:
+                # Touched but unchanged: keep the existing buffers.
+                _datasets[path] = (key, cached[1])
+            elif cached is not None and data_loader.appended_from(path) == {
+                "sha256": cached[1].version, "rows": len(cached[1]._frame),
+            }:
+                # New years appended to the version we hold: update its aggregates.
+                _datasets[path] = (key, Dataset.appended(cached[1], df, version, len(cached[1]._frame)))
+            else:
+                _datasets[path] = (key, Dataset(df, version))
+        return _datasets[path][1]
@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import memo
+
+# Precomputed distribution and radar data for app2.py.
+#
+# Histogram bins, KDE curves and radar vectors are computed once per dataset
+# version and metric and shared by every session through an LRU memo, so a
+# rerun only turns a few hundred numbers into Plotly traces. Their size does
+# not depend on the number of rows: histograms have at most P4_MAX_BINS bins,
+# KDE curves KDE_POINTS points and radar charts one point per metric.
+#
+# The KDE is a binned Gaussian KDE: the values are counted into KDE_POINTS
+# grid cells and the counts convolved with the kernel, which costs one pass
+# over the data plus a grid-sized convolution instead of rows x grid kernel
+# evaluations.
+
+MAX_BINS = int(os.environ.get("P4_MAX_BINS", "60"))
+KDE_POINTS = 256
+
+views = memo.LRUMemo(maxsize=64)
+
+
+def _finite(values):
+    values = np.asarray(values, dtype="float64")
+    return values[np.isfinite(values)]
+
+
+def histogram(values, max_bins=MAX_BINS):
+    """Return ``(edges, counts)`` with numpy's "auto" bin width, capped at ``max_bins`` bins."""
+    values = _finite(values)
+    if len(values) == 0:
+        return np.array([0.0, 1.0]), np.zeros(1, dtype=np.int64)
+    edges = np.histogram_bin_edges(values, bins="auto")
+    if len(edges) - 1 > max_bins:
+        edges = np.linspace(edges[0], edges[-1], max_bins + 1)
+    counts, edges = np.histogram(values, bins=edges)
+    return edges, counts
+
+
+def kde(values, points=KDE_POINTS):
+    """Return ``(grid, density)``: a Gaussian KDE with Scott's bandwidth on ``points`` points."""
+    values = _finite(values)
+    n = len(values)
+    if n < 2 or values.min() == values.max():
+        return np.array([]), np.array([])
+    bandwidth = values.std(ddof=1) * n ** (-1 / 5)
+    grid = np.linspace(values.min() - 3 * bandwidth, values.max() + 3 * bandwidth, points)
+    step = grid[1] - grid[0]
+    counts, _ = np.histogram(values, bins=points, range=(grid[0] - step / 2, grid[-1] + step / 2))
+    # The kernel must not be longer than the grid for mode="same" to keep its length.
+    half = min(int(np.ceil(4 * bandwidth / step)), (points - 1) // 2)
+    offsets = np.arange(-half, half + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    density = np.convolve(counts, kernel, mode="same") / (n * bandwidth * np.sqrt(2 * np.pi))
+    return grid, density
+
+
+def radar_vectors(cube, metrics, stat="mean"):
+    """Return each president's ``stat`` per metric, scaled to 0..1 across presidents.
+
+    Metrics differ in scale by many orders of magnitude (Debt vs inflation
+    rate), so every axis is min-max normalized; a metric that is the same for
+    every president sits at 0.5.
+    """
+    table = cube.xs(stat, axis=1, level=1)[list(metrics)].astype("float64")
+    low, high = table.min(), table.max()
+    span = (high - low).replace(0, np.nan)
+    scaled = ((table - low) / span).fillna(0.5).where(table.notna())
+    scaled.index = pd.Index(scaled.index.astype(str), name="President")
+    return scaled
+
+
+def distribution(dataset, metric, max_bins=MAX_BINS):
+    """Return ``{"edges", "counts", "grid", "density"}`` for ``metric``, shared across sessions.
+
+    The density is scaled to counts per bin so it can be drawn over the histogram.
+    """
+    key = ("distribution", dataset.version, metric, max_bins)
+
+    def build():
+        values = dataset.frame[metric].to_numpy(dtype="float64", na_value=np.nan)
+        edges, counts = histogram(values, max_bins)
+        grid, density = kde(values)
+        return {
+            "edges": edges,
+            "counts": counts,
+            "grid": grid,
+            "density": density * counts.sum() * (edges[1] - edges[0]),
+        }
+
+    return views.get(key, build)
+
+
+def radar(dataset, metrics):
+    """Return radar_vectors() of ``dataset``'s cube, shared across sessions."""
+    metrics = tuple(metrics)
+    key = ("radar", dataset.version, metrics)
+    return views.get(key, lambda: radar_vectors(dataset.cube, metrics))
+
+
+def totals(dataset, metric):
+    """Return each president's total of ``metric`` as a President/``metric`` frame.
+
+    Cube metrics come from the cube's sums; any other numeric column of
+    ``dataset.frame`` (level-chained, amount, ...) is summed on first use.
+    """
+    key = ("totals", dataset.version, metric)
+
+    def build():
+        cube = dataset.cube
+        if (metric, "sum") in cube.columns:
+            column = cube[(metric, "sum")]
+        else:
+            frame = dataset.frame
+            column = frame[metric].groupby(frame["President"], observed=True).sum().reindex(cube.index)
+        table = column.rename(metric).reset_index()
+        table["President"] = table["President"].astype(str)
+        return table
+
+    return views.get(key, build)
+
@@ -0,0 +1,188 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import aggregates
+import charts
+import data_loader
+from dataset import get_dataset
+
+# Pre-render every pairwise comparison for the reporting portal.
+#
+# Uses the same cube and Altair chart as the dashboards, one chart per
+# president pair and metric set, written to
+#   <out>/<president-a>__<president-b>/<metrics>.<format>
+# Work is split across a process pool; each worker loads the dataset once
+# (from the parquet snapshot when there is one). A manifest in <out> records
+# what each file was rendered from, so a rerun only renders charts whose
+# data, size or chart version changed.
+#
+#   python export.py --out exports --formats svg png html json
+
+# Bump when charts.comparison_chart changes so existing exports are redone.
+CHART_VERSION = 1
+FORMATS = ["svg", "png", "html", "json"]
+MANIFEST = "manifest.json"
+BATCH_SIZE = 16
+
+_dataset = None
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def metric_sets(mode, metrics=tuple(aggregates.METRIC_LABELS)):
+    """Return the metric tuples to export: every subset, each single metric, or all together."""
+    if mode == "singles":
+        return [(m,) for m in metrics]
+    if mode == "full":
+        return [tuple(metrics)]
+    return [
+        subset
+        for size in range(1, len(metrics) + 1)
+        for subset in itertools.combinations(metrics, size)
+    ]
+
+
+def output_path(out, pair, metrics, fmt):
+    folder = f"{slug(pair[0])}__{slug(pair[1])}"
+    return os.path.join(out, folder, f"{'+'.join(slug(m) for m in metrics)}.{fmt}")
+
+
+def stamp(version, width, height):
+    """What a file was rendered from; a different stamp means it is out of date."""
+    return hashlib.sha256(f"{version}:{CHART_VERSION}:{width}x{height}".encode()).hexdigest()[:16]
+
+
+def _read_manifest(out):
+    try:
+        with open(os.path.join(out, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(out, manifest):
+    path = os.path.join(out, MANIFEST)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _init_worker(csv_path):
+    global _dataset
+    _dataset = get_dataset(csv_path)
+
+
+def _render(jobs, width, height):
+    """Render a batch of (pair, metrics, [(format, path), ...]); return the written paths."""
+    written = []
+    for pair, metrics, targets in jobs:
+        comparison_df = aggregates.comparison_frame(
+            _dataset.cube, pair, metrics, labels=aggregates.METRIC_LABELS
+        )
+        chart = charts.comparison_chart(comparison_df, pair, width=width, height=height)
+        for fmt, path in targets:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                chart.save(tmp, format=fmt)
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            written.append(path)
+    return written
+
+
+def plan(out, presidents, sets, formats, current, manifest):
+    """Return the render jobs for every output that is missing or out of date."""
+    jobs = []
+    for pair in itertools.combinations(presidents, 2):
+        for metrics in sets:
+            targets = []
+            for fmt in formats:
+                path = output_path(out, pair, metrics, fmt)
+                rel = os.path.relpath(path, out)
+                if manifest.get(rel) != current or not os.path.exists(path):
+                    targets.append((fmt, path))
+            if targets:
+                jobs.append((pair, metrics, targets))
+    return jobs
+
+
+def export(out, formats=FORMATS, mode="all", presidents=None, workers=None,
+           width=200, height=400, csv_path=None, force=False, progress=print):
+    """Render every missing or stale chart; return (written, skipped, seconds)."""
+    csv_path = csv_path or data_loader.CSV_PATH
+    dataset = get_dataset(csv_path)
+    presidents = presidents or dataset.presidents
+    sets = metric_sets(mode)
+    current = stamp(dataset.version, width, height)
+    total = len(list(itertools.combinations(presidents, 2))) * len(sets) * len(formats)
+
+    os.makedirs(out, exist_ok=True)
+    manifest = {} if force else _read_manifest(out)
+    jobs = plan(out, presidents, sets, formats, current, manifest)
+    pending = sum(len(targets) for _, _, targets in jobs)
+
+    start = time.perf_counter()
+    written = 0
+    last_report = start
+    batches = [jobs[i:i + BATCH_SIZE] for i in range(0, len(jobs), BATCH_SIZE)]
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(csv_path,)) as pool:
+            futures = [pool.submit(_render, batch, width, height) for batch in batches]
+            for future in as_completed(futures):
+                for path in future.result():
+                    manifest[os.path.relpath(path, out)] = current
+                    written += 1
+                now = time.perf_counter()
+                if progress and (now - last_report > 2 or written == pending):
+                    last_report = now
+                    elapsed = now - start
+                    progress(f"{written}/{pending} files, {written / elapsed:.1f} files/s, "
+                             f"{elapsed:.0f}s elapsed")
+    finally:
+        # Keep what was finished even if the run is interrupted.
+        _write_manifest(out, manifest)
+    return written, total - pending, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every pairwise comparison chart.")
+    parser.add_argument("--out", default=os.path.join(data_loader.BASE_DIR, "exports"))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--metric-sets", choices=["all", "singles", "full"], default="all",
+                        help="every non-empty metric subset (default), each metric alone, or all five")
+    parser.add_argument("--presidents", nargs="+", help="restrict to these presidents")
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    parser.add_argument("--width", type=int, default=200)
+    parser.add_argument("--height", type=int, default=400)
+    parser.add_argument("--csv", help="CSV to export from (default: P4_CSV_PATH)")
+    parser.add_argument("--force", action="store_true", help="re-render even up-to-date files")
+    args = parser.parse_args()
+
+    if {"svg", "png"} & set(args.formats):
+        try:
+            import vl_convert  # noqa: F401
+        except ImportError:
+            parser.error("svg/png export needs vl-convert-python (pip install vl-convert-python)")
+
+    written, skipped, seconds = export(
+        args.out, args.formats, args.metric_sets, args.presidents, args.workers,
+        args.width, args.height, args.csv, args.force,
+    )
+    rate = f", {written / seconds:.1f} files/s" if written and seconds else ""
+    print(f"{written} written, {skipped} up to date in {args.out} ({seconds:.1f}s{rate})")
+
+
+if __name__ == "__main__":
+    main()
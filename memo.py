@@ -0,0 +1,117 @@
+import os
+import threading
+from collections import OrderedDict
+
+import aggregates
+import charts
+import term_metrics
+
+# Process-wide memo of finished comparison views.
+#
+# Sessions that pick the same presidents and metrics (popular pairs come up
+# again and again) get the comparison table and the serialized Vega-Lite spec
+# that an earlier session already built. Entries are keyed by dataset version,
+# so a new CSV never serves stale views, and the least recently used entries
+# are dropped once P4_MEMO_SIZE views are held.
+
+MAX_ENTRIES = int(os.environ.get("P4_MEMO_SIZE", "256"))
+
+
+class LRUMemo:
+    def __init__(self, maxsize=MAX_ENTRIES):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Return the value for ``key``, calling ``compute()`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Computed outside the lock; two sessions missing on the same key at
+        # once both compute it and the second result wins, which is harmless.
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_many(self, keys, compute):
+        """Return ``{key: value}`` for ``keys``, calling ``compute(missing)`` once for every miss.
+
+        ``compute`` gets the missing keys as a list and returns their values
+        in the same order, so misses can be computed together (e.g. in a pool).
+        """
+        found, missing = {}, []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found[key] = self._entries[key]
+                else:
+                    self.misses += 1
+                    missing.append(key)
+
+        if missing:
+            values = compute(missing)
+            found.update(zip(missing, values))
+            with self._lock:
+                for key, value in zip(missing, values):
+                    self._entries[key] = value
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+comparisons = LRUMemo()
+
+
+def comparison_view(dataset, presidents, metrics, variant, width=200, height=400):
+    """Return ``(comparison_df, chart_spec)`` for the selection, shared across sessions.
+
+    ``variant`` names the app and chart layout the spec was built for. The
+    selection order of presidents does not matter: the view is built for the
+    sorted selection and only the table's columns are put back in order.
+    """
+    presidents = list(dict.fromkeys(presidents))
+    metrics = tuple(metrics)
+    key = (dataset.version, tuple(sorted(presidents)), metrics, variant, width, height)
+
+    def build():
+        ordered = list(key[1])
+        # Term-level metrics are computed once per dataset version, on first use.
+        terms = dataset.term_metrics if any(m in term_metrics.TERM_METRICS for m in metrics) else None
+        frame = aggregates.comparison_frame(
+            dataset.cube, ordered, metrics, labels=term_metrics.METRIC_LABELS, terms=terms
+        )
+        spec = charts.comparison_chart(frame, ordered, width=width, height=height).to_dict()
+        return frame, spec
+
+    frame, spec = comparisons.get(key, build)
+    return frame[["Metric", *presidents]], spec
@@ -0,0 +1,217 @@
+import argparse
+import base64
+import html
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; without it the original URLs are used.
+    Image = None
+
+# Portrait thumbnails for the Prespic.py gallery.
+#
+# Each portrait is downloaded once, shrunk to a 100px thumbnail in
+# .portraits/ and served inline as a data URI. The browser then gets a few KB
+# inside the page, with no request to whitehouse.gov on every selection
+# change. Portraits that cannot be fetched fall back to an SVG placeholder
+# instead of a broken image.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("P4_PORTRAIT_CACHE", os.path.join(BASE_DIR, ".portraits"))
+# A directory with the original files (named like the last part of each URL)
+# can stand in for whitehouse.gov when running offline.
+SOURCE_DIR = os.environ.get("P4_PORTRAIT_SOURCE")
+
+THUMBNAIL_SIZE = 100
+FETCH_TIMEOUT = 5
+RETRY_AFTER = 300
+MAX_WORKERS = 8
+
+# President Image URLs (these URLs are from the official White House website)
+PORTRAIT_URLS = {
+    "George Washington": "https://www.whitehouse.gov/wp-content/uploads/2021/01/01_georgewashington.jpg",
+    "John Adams": "https://www.whitehouse.gov/wp-content/uploads/2021/01/02_johnadams.jpg",
+    "Thomas Jefferson": "https://www.whitehouse.gov/wp-content/uploads/2021/01/03_thomasjefferson.jpg",
+    "James Madison": "https://www.whitehouse.gov/wp-content/uploads/2021/01/04_jamesmadison.jpg",
+    "James Monroe": "https://www.whitehouse.gov/wp-content/uploads/2021/01/05_jamesmonroe.jpg",
+    "John Quincy Adams": "https://www.whitehouse.gov/wp-content/uploads/2021/01/06_johnquincyadams.jpg",
+    "Andrew Jackson": "https://www.whitehouse.gov/wp-content/uploads/2021/01/07_andrewjackson.jpg",
+    "Martin Van Buren": "https://www.whitehouse.gov/wp-content/uploads/2021/01/08_martinvanburen.jpg",
+    "William Henry Harrison": "https://www.whitehouse.gov/wp-content/uploads/2021/01/09_williamhenryharrison.jpg",
+    "John Tyler": "https://www.whitehouse.gov/wp-content/uploads/2021/01/10_johntyler.jpg",
+    "James K. Polk": "https://www.whitehouse.gov/wp-content/uploads/2021/01/11_jameskpolk.jpg",
+    "Zachary Taylor": "https://www.whitehouse.gov/wp-content/uploads/2021/01/12_zacharytaylor.jpg",
+    "Millard Fillmore": "https://www.whitehouse.gov/wp-content/uploads/2021/01/13_millardfillmore.jpg",
+    "Franklin Pierce": "https://www.whitehouse.gov/wp-content/uploads/2021/01/14_franklinpierce.jpg",
+    "James Buchanan": "https://www.whitehouse.gov/wp-content/uploads/2021/01/15_jamesbuchanan.jpg",
+    "Abraham Lincoln": "https://www.whitehouse.gov/wp-content/uploads/2021/01/16_abrahamlincoln.jpg",
+    "Andrew Johnson": "https://www.whitehouse.gov/wp-content/uploads/2021/01/17_andrewjohnson.jpg",
+    "Ulysses S. Grant": "https://www.whitehouse.gov/wp-content/uploads/2021/01/18_ulyssessgrant.jpg",
+    "Rutherford B. Hayes": "https://www.whitehouse.gov/wp-content/uploads/2021/01/19_rutherfordbhayes.jpg",
+    "James A. Garfield": "https://www.whitehouse.gov/wp-content/uploads/2021/01/20_jamesagarfield.jpg",
+    "Chester A. Arthur": "https://www.whitehouse.gov/wp-content/uploads/2021/01/21_chesteraarthur.jpg",
+    "Grover Cleveland": "https://www.whitehouse.gov/wp-content/uploads/2021/01/22_grovercleveland.jpg",
+    "Benjamin Harrison": "https://www.whitehouse.gov/wp-content/uploads/2021/01/23_benjaminharrison.jpg",
+    "William McKinley": "https://www.whitehouse.gov/wp-content/uploads/2021/01/25_williammckinley.jpg",
+    "Theodore Roosevelt": "https://www.whitehouse.gov/wp-content/uploads/2021/01/26_theodoreroosevelt.jpg",
+    "William Howard Taft": "https://www.whitehouse.gov/wp-content/uploads/2021/01/27_williamhowardtaft.jpg",
+    "Woodrow Wilson": "https://www.whitehouse.gov/wp-content/uploads/2021/01/28_woodrowwilson.jpg",
+    "Warren G. Harding": "https://www.whitehouse.gov/wp-content/uploads/2021/01/29_warrengharding.jpg",
+    "Calvin Coolidge": "https://www.whitehouse.gov/wp-content/uploads/2021/01/30_calvincoolidge.jpg",
+    "Herbert Hoover": "https://www.whitehouse.gov/wp-content/uploads/2021/01/31_herberthoover.jpg",
+    "Franklin D. Roosevelt": "https://www.whitehouse.gov/wp-content/uploads/2021/01/32_franklindroosevelt.jpg",
+    "Harry S. Truman": "https://www.whitehouse.gov/wp-content/uploads/2021/01/33_harrystruman.jpg",
+    "Dwight D. Eisenhower": "https://www.whitehouse.gov/wp-content/uploads/2021/01/34_dwightdeisenhower.jpg",
+    "John F. Kennedy": "https://www.whitehouse.gov/wp-content/uploads/2021/01/35_johnfkennedy.jpg",
+    "Lyndon B. Johnson": "https://www.whitehouse.gov/wp-content/uploads/2021/01/36_lyndonbjohnson.jpg",
+    "Richard Nixon": "https://www.whitehouse.gov/wp-content/uploads/2021/01/37_richardnixon.jpg",
+    "Gerald Ford": "https://www.whitehouse.gov/wp-content/uploads/2021/01/38_geraldford.jpg",
+    "Jimmy Carter": "https://www.whitehouse.gov/wp-content/uploads/2021/01/39_jimmycarter.jpg",
+    "Ronald Reagan": "https://www.whitehouse.gov/wp-content/uploads/2021/01/40_ronaldreagan.jpg",
+    "George H. W. Bush": "https://www.whitehouse.gov/wp-content/uploads/2021/01/41_georgehwbush.jpg",
+    "Bill Clinton": "https://www.whitehouse.gov/wp-content/uploads/2021/01/42_billclinton.jpg",
+    "George W. Bush": "https://www.whitehouse.gov/wp-content/uploads/2021/01/43_georgewbush.jpg",
+    "Barack Obama": "https://www.whitehouse.gov/wp-content/uploads/2021/01/44_barackobama.jpg",
+    "Donald J. Trump": "https://www.whitehouse.gov/wp-content/uploads/2021/01/45_donaldjtrump.jpg",
+    "Joseph R. Biden": "https://www.whitehouse.gov/wp-content/uploads/2021/01/46_josephrjbiden.jpg",
+}
+
+# Names used in gdp_year_with_more.csv that differ from the keys above.
+ALIASES = {
+    "Richard M. Nixon": "Richard Nixon",
+    "Gerald R. Ford": "Gerald Ford",
+    "George Bush": "George H. W. Bush",
+    "William J. Clinton": "Bill Clinton",
+    "Donald Trump": "Donald J. Trump",
+    "Joe Biden": "Joseph R. Biden",
+}
+
+_lock = threading.Lock()
+_data_uris = {}
+_failed = {}
+
+
+def portrait_url(president):
+    return PORTRAIT_URLS.get(ALIASES.get(president, president))
+
+
+def _thumbnail_format():
+    return "WEBP" if features.check("webp") else "JPEG"
+
+
+def thumbnail_path(president):
+    url = portrait_url(president)
+    if url is None or Image is None:
+        return None
+    name = os.path.splitext(os.path.basename(url))[0]
+    return os.path.join(CACHE_DIR, f"{name}.{THUMBNAIL_SIZE}.{_thumbnail_format().lower()}")
+
+
+def _open_original(url, source_dir):
+    if source_dir:
+        return open(os.path.join(source_dir, os.path.basename(url)), "rb")
+    request = urllib.request.Request(url, headers={"User-Agent": "P4-portraits"})
+    return urllib.request.urlopen(request, timeout=FETCH_TIMEOUT)
+
+
+def fetch_thumbnail(president, source_dir=None):
+    """Download one portrait and write its thumbnail; return the path or None."""
+    path = thumbnail_path(president)
+    if path is None:
+        return None
+    if os.path.exists(path):
+        return path
+    source_dir = source_dir or SOURCE_DIR
+    try:
+        with _open_original(portrait_url(president), source_dir) as original:
+            image = Image.open(original)
+            image.load()
+        image = image.convert("RGB")
+        image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE * 4))
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        image.save(tmp, format=_thumbnail_format(), quality=80)
+        os.replace(tmp, path)
+        return path
+    except (OSError, ValueError):
+        # Network errors, HTTP errors (URLError/HTTPError are OSErrors) and
+        # undecodable images all end up as a placeholder.
+        return None
+
+
+def placeholder(president):
+    initials = "".join(part[0] for part in president.replace(".", "").split() if part[0].isupper())[:3]
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{THUMBNAIL_SIZE}" height="{THUMBNAIL_SIZE}">'
+        f'<rect width="100%" height="100%" fill="#d0d4da"/>'
+        f'<text x="50%" y="50%" dy=".35em" text-anchor="middle" font-family="sans-serif" '
+        f'font-size="32" fill="#4a5160">{html.escape(initials)}</text></svg>'
+    )
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode()).decode()
+
+
+def _data_uri(path):
+    with open(path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    return f"data:image/{_thumbnail_format().lower()};base64,{encoded}"
+
+
+def thumbnail_srcs(presidents, source_dir=None):
+    """Return {president: img src} for ``presidents``.
+
+    Cached thumbnails are read once per process. Missing ones are fetched
+    concurrently; failures get a placeholder and are not retried for
+    RETRY_AFTER seconds, so a dead link does not stall every rerun.
+    """
+    if Image is None:
+        return {p: portrait_url(p) or placeholder(p) for p in presidents}
+
+    now = time.monotonic()
+    with _lock:
+        missing = [
+            p for p in dict.fromkeys(presidents)
+            if p not in _data_uris and now - _failed.get(p, -RETRY_AFTER) >= RETRY_AFTER
+        ]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(missing))) as pool:
+            paths = list(pool.map(lambda p: fetch_thumbnail(p, source_dir), missing))
+        with _lock:
+            for president, path in zip(missing, paths):
+                if path is None:
+                    _failed[president] = now
+                else:
+                    _data_uris[president] = _data_uri(path)
+                    _failed.pop(president, None)
+    return {p: _data_uris.get(p) or placeholder(p) for p in presidents}
+
+
+def prefetch(presidents=None, source_dir=None, workers=MAX_WORKERS):
+    """Fetch every portrait in parallel; return the names that failed."""
+    presidents = list(presidents or PORTRAIT_URLS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        paths = list(pool.map(lambda p: fetch_thumbnail(p, source_dir), presidents))
+    return [p for p, path in zip(presidents, paths) if path is None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download portraits and build the thumbnail cache.")
+    parser.add_argument("--source", help="directory of original images to use instead of whitehouse.gov")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+
+    if Image is None:
+        parser.error("Pillow is required to build thumbnails (pip install pillow)")
+    start = time.perf_counter()
+    failed = prefetch(source_dir=args.source, workers=args.workers)
+    print(f"{len(PORTRAIT_URLS) - len(failed)}/{len(PORTRAIT_URLS)} thumbnails in {CACHE_DIR} "
+          f"({time.perf_counter() - start:.1f}s)")
+    for president in failed:
+        print(f"  failed: {president}")
+
+
+if __name__ == "__main__":
+    main()
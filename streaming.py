@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import data_loader
+
+# Chunked ingest for CSVs too big to load at once.
+#
+# The file is read P4_CHUNK_ROWS rows at a time; each chunk gets the same
+# currency cleanup as data_loader and is folded into running per-president
+# totals (count, sum, min, max, first, last), so memory is one chunk plus a
+# presidents x metrics table no matter how big the file is. The totals can be
+# turned into a build_cube()-shaped frame at any point, which is what lets
+# the apps show partial results while the rest of the file is still read.
+
+CHUNK_ROWS = int(os.environ.get("P4_CHUNK_ROWS", "100000"))
+
+
+class CubeAccumulator:
+    def __init__(self, metrics=data_loader.CURRENCY_COLUMNS):
+        self.metrics = list(metrics)
+        self.presidents = {}
+        self.rows = 0
+        shape = (0, len(self.metrics))
+        self.count = np.zeros(shape)
+        self.total = np.zeros(shape)
+        self.low = np.full(shape, np.nan)
+        self.high = np.full(shape, np.nan)
+        self.first = np.full(shape, np.nan)
+        self.last = np.full(shape, np.nan)
+
+    def _grow(self, names):
+        new = [name for name in names if name not in self.presidents]
+        for name in new:
+            self.presidents[name] = len(self.presidents)
+        if new:
+            extra = (len(new), len(self.metrics))
+            self.count = np.vstack([self.count, np.zeros(extra)])
+            self.total = np.vstack([self.total, np.zeros(extra)])
+            self.low = np.vstack([self.low, np.full(extra, np.nan)])
+            self.high = np.vstack([self.high, np.full(extra, np.nan)])
+            self.first = np.vstack([self.first, np.full(extra, np.nan)])
+            self.last = np.vstack([self.last, np.full(extra, np.nan)])
+        return np.array([self.presidents[name] for name in names], dtype=np.intp)
+
+    def update(self, chunk, by="President"):
+        """Fold one cleaned chunk into the running totals."""
+        self.rows += len(chunk)
+        grouped = chunk.groupby(by, sort=False)[self.metrics]
+        if grouped.ngroups == 0:
+            return
+        stats = grouped.agg(["count", "sum", "min", "max", "first", "last"])
+        rows = self._grow(stats.index.tolist())
+
+        def block(stat):
+            return stats.xs(stat, axis=1, level=1)[self.metrics].to_numpy(dtype="float64")
+
+        self.count[rows] += block("count")
+        self.total[rows] += block("sum")
+        self.low[rows] = np.fmin(self.low[rows], block("min"))
+        self.high[rows] = np.fmax(self.high[rows], block("max"))
+        first = self.first[rows]
+        self.first[rows] = np.where(np.isnan(first), block("first"), first)
+        last = block("last")
+        self.last[rows] = np.where(np.isnan(last), self.last[rows], last)
+
+    def cube(self):
+        """Return the totals so far in the shape of aggregates.build_cube()."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(self.count > 0, self.total / self.count, np.nan)
+        values = {"mean": mean, "sum": self.total, "min": self.low, "max": self.high,
+                  "first": self.first, "last": self.last}
+        columns = pd.MultiIndex.from_product([self.metrics, aggregates.STATS])
+        data = np.stack([values[stat] for stat in aggregates.STATS], axis=2)
+        data = data.reshape(len(self.presidents), len(columns))
+        return pd.DataFrame(data, index=pd.Index(list(self.presidents), name="President"), columns=columns)
+
+
+def iter_chunks(path=data_loader.CSV_PATH, chunk_rows=CHUNK_ROWS):
+    """Yield ``(cleaned chunk, fraction of the file read)``."""
+    size = os.path.getsize(path) or 1
+    with open(path, "rb") as f:
+        for chunk in pd.read_csv(f, chunksize=chunk_rows):
+            chunk, bad_cells = data_loader.parse_numeric_columns(chunk)
+            if len(bad_cells):
+                data_loader.logger.warning("%d unparseable numeric cells left as NaN", len(bad_cells))
+            yield chunk, min(f.tell() / size, 1.0)
+
+
+def stream_cube(path=data_loader.CSV_PATH, chunk_rows=CHUNK_ROWS, on_progress=None):
+    """Build the president cube chunk by chunk; ``on_progress(accumulator, fraction)`` after each."""
+    accumulator = CubeAccumulator()
+    for chunk, fraction in iter_chunks(path, chunk_rows):
+        accumulator.update(chunk)
+        if on_progress:
+            on_progress(accumulator, fraction)
+    return accumulator.cube()
+
+
+def show_progress(backend, interval=0.5):
+    """While a streaming backend is still ingesting, show its partial results.
+
+    Returns at once for backends that are already complete.
+    """
+    if getattr(backend, "done", None) is None or backend.done.is_set():
+        return
+    import streamlit as st
+
+    bar = st.progress(0.0, text="Reading data...")
+    table = st.empty()
+    while not backend.done.wait(interval):
+        fraction, cube = backend.snapshot()
+        bar.progress(fraction, text=f"Reading data... {fraction:.0%} ({backend.rows_read:,} rows so far)")
+        if len(cube):
+            table.dataframe(cube.xs("mean", axis=1, level=1))
+    bar.empty()
+    table.empty()
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# Row-offset index over the date-sorted dataset.
+#
+# Each president owns one or more contiguous runs of rows (Grover Cleveland
+# would own two), and the rows are ordered by date, so both "this president's
+# term" and "these years" are plain positional slices. Slicing with iloc
+# returns views, so lookups cost a dict hit or a binary search instead of a
+# scan of the whole President column.
+
+
+class TermIndex:
+    def __init__(self, df, by="President", date="date"):
+        dates = df[date].to_numpy()
+        if len(dates) > 1 and (np.diff(dates) < 0).any():
+            raise ValueError(f"TermIndex needs rows sorted by {date!r}")
+
+        self.df = df
+        self.dates = dates
+        self.runs = {}
+
+        # Compare integer codes rather than strings to find where runs change.
+        codes, names = pd.factorize(df[by])
+        if len(codes):
+            boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+            starts = np.concatenate([[0], boundaries])
+            stops = np.concatenate([boundaries, [len(codes)]])
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                if codes[start] < 0:
+                    continue  # rows with no president
+                self.runs.setdefault(names[codes[start]], []).append((start, stop))
+
+    @property
+    def presidents(self):
+        return list(self.runs)
+
+    def year_bounds(self, first=None, last=None):
+        """Return the (start, stop) row offsets of years ``first..last`` inclusive."""
+        start = 0 if first is None else int(np.searchsorted(self.dates, first, side="left"))
+        stop = len(self.dates) if last is None else int(np.searchsorted(self.dates, last, side="right"))
+        return start, max(start, stop)
+
+    def terms(self, president, first=None, last=None):
+        """Return one view per contiguous run of ``president``, clipped to the year window."""
+        lo, hi = self.year_bounds(first, last)
+        views = []
+        for start, stop in self.runs.get(president, []):
+            start, stop = max(start, lo), min(stop, hi)
+            if start < stop:
+                views.append(self.df.iloc[start:stop])
+        return views
+
+    def rows(self, president, first=None, last=None):
+        """Return all of ``president``'s rows in the window.
+
+        A single run comes back as a view; only presidents with
+        non-consecutive terms pay for a concat.
+        """
+        views = self.terms(president, first, last)
+        if len(views) == 1:
+            return views[0]
+        if not views:
+            return self.df.iloc[0:0]
+        return pd.concat(views)
+
+    def years(self, first=None, last=None):
+        """Return the rows dated ``first..last`` inclusive as a view."""
+        start, stop = self.year_bounds(first, last)
+        return self.df.iloc[start:stop]
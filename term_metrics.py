@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+import aggregates
+
+# Term-level indicators, one value per president.
+#
+# Column means treat a two-year and an eight-year tenure alike and say
+# nothing about what happened over the term. These metrics are built from
+# year-over-year windows over the date-sorted data instead: each year's change
+# is credited to the president of that year, so a term's first year counts
+# the change from the year before it. One groupby per dataset version
+# computes all of them.
+#
+# A 0 in level-current, GDP or Debt means "not recorded" in the CSV
+# (level-current stops after 2016, GDP starts in 1947), not a real value.
+
+TERM_METRICS = {
+    "gdp cagr": "GDP CAGR",
+    "debt added per year": "Debt Added per Year",
+    "debt-to-gdp": "Debt-to-GDP (End of Term)",
+    "compounded inflation": "Compounded Inflation",
+}
+
+# Every metric the comparison views can show: the cube's column means first.
+METRIC_LABELS = {**aggregates.METRIC_LABELS, **TERM_METRICS}
+
+# Columns build_term_metrics() reads, for backends that select columns.
+COLUMNS = ["President", "date", "level-current", "GDP", "Debt", "inflation rate"]
+
+
+def first_of_year(df, previous_date=None):
+    """Return the rows of date-sorted ``df`` that start a new year.
+
+    ``previous_date`` is the date of the row before ``df`` (for a file read
+    in chunks), so a year split across two chunks is kept only once.
+    """
+    dates = df["date"].to_numpy()
+    keep = np.ones(len(dates), dtype=bool)
+    keep[1:] = dates[1:] != dates[:-1]
+    if previous_date is not None and len(dates):
+        keep[0] = dates[0] != previous_date
+    return df[keep]
+
+
+def build_term_metrics(df, by="President"):
+    """Return a frame indexed by president with one column per TERM_METRICS entry.
+
+    - gdp cagr: compound annual growth of nominal GDP over the term, from
+      level-current (GDP where level-current is missing)
+    - debt added per year: mean yearly change in Debt
+    - debt-to-gdp: Debt / level-current (in billions) in the term's last year
+      with both recorded
+    - compounded inflation: product of (1 + inflation rate) over the term, minus 1
+
+    ``df`` must be sorted by date. Rows repeating a year are ignored.
+    """
+    years = first_of_year(df)[["date", "level-current", "GDP", "Debt", "inflation rate", by]]
+
+    level = years["level-current"].where(years["level-current"] > 0)
+    gdp = years["GDP"].where(years["GDP"] > 0)
+    debt = years["Debt"].where(years["Debt"] > 0)
+    consecutive = years["date"].diff() == 1
+
+    # Growth is taken within one series so the switch from level-current to
+    # GDP (which differ by a few percent) never shows up as growth.
+    growth = (level / level.shift()).fillna(gdp / gdp.shift()).where(consecutive)
+    per_year = pd.DataFrame({
+        "log_growth": np.log(growth),
+        "debt_added": debt.diff().where(consecutive),
+        "debt_to_gdp": debt / (level.fillna(gdp) * 1e9),
+        "log_inflation": np.log1p(years["inflation rate"]),
+    })
+    grouped = per_year.groupby(years[by], sort=False, observed=True)
+    return pd.DataFrame({
+        "gdp cagr": np.expm1(grouped["log_growth"].mean()),
+        "debt added per year": grouped["debt_added"].mean(),
+        "debt-to-gdp": grouped["debt_to_gdp"].last(),
+        "compounded inflation": np.expm1(grouped["log_inflation"].sum(min_count=1)),
+    })
@@ -0,0 +1,175 @@
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Opt-in per-stage timing for the dashboards.
+#
+# Apps wrap their expensive steps in ``with timing.stage("name"):`` between
+# start_rerun() and finish_rerun(). With P4_TIMING unset, stage() hands back a
+# shared no-op context manager, so the instrumentation costs one function call
+# per stage. When enabled, every rerun is appended as one JSON line to
+# P4_TIMING_LOG, and P4_TIMING_PANEL=1 also shows a breakdown in the app.
+# Fragment bodies go inside ``with timing.fragment(app, name):`` so a rerun of
+# just that fragment is logged as its own record.
+#
+# Summarize a day of traffic with: python timing.py [log file]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENABLED = os.environ.get("P4_TIMING", "") == "1"
+SHOW_PANEL = os.environ.get("P4_TIMING_PANEL", "") == "1"
+LOG_PATH = os.environ.get("P4_TIMING_LOG", os.path.join(BASE_DIR, ".timings", "timings.jsonl"))
+
+_NULL = contextlib.nullcontext()
+_current = threading.local()
+_write_lock = threading.Lock()
+_last = {}
+
+
+def start_rerun(app):
+    """Begin timing one script run of ``app`` on this thread."""
+    if not ENABLED:
+        return
+    _current.app = app
+    _current.fragment = None
+    _current.stages = []
+    _current.start = time.perf_counter()
+
+
+@contextlib.contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = getattr(_current, "stages", None)
+        if stages is not None:
+            stages.append((name, time.perf_counter() - start))
+
+
+def stage(name):
+    """Context manager timing ``name``; a shared no-op when timing is off."""
+    if not ENABLED:
+        return _NULL
+    return _timed(name)
+
+
+def _fragment_only_run():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+
+@contextlib.contextmanager
+def fragment(app, name):
+    """Time an st.fragment body.
+
+    During a full run its stages count towards the page's rerun; when only
+    the fragment reruns, it is started and logged as a rerun of its own.
+    """
+    if not ENABLED or not _fragment_only_run():
+        yield
+        return
+    start_rerun(app)
+    _current.fragment = name
+    try:
+        yield
+    finally:
+        finish_rerun()
+
+
+def finish_rerun():
+    """Log the finished rerun and, if enabled, render the debug panel."""
+    if not ENABLED or getattr(_current, "stages", None) is None:
+        return None
+    stages = {}
+    for name, seconds in _current.stages:
+        stages[name] = stages.get(name, 0.0) + seconds
+    record = {
+        "ts": time.time(),
+        "app": _current.app,
+        "fragment": _current.fragment,
+        "total": time.perf_counter() - _current.start,
+        "stages": stages,
+    }
+    _current.stages = None
+    _last[record["app"]] = record
+
+    if LOG_PATH:
+        line = json.dumps(record) + "\n"
+        try:
+            with _write_lock:
+                os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
+                with open(LOG_PATH, "a") as f:
+                    f.write(line)
+        except OSError:
+            pass
+    if SHOW_PANEL:
+        _show_panel(record)
+    return record
+
+
+def last_rerun(app):
+    """Return the most recent finished rerun record for ``app`` in this process."""
+    return _last.get(app)
+
+
+def _show_panel(record):
+    import streamlit as st
+
+    scope = f" ({record['fragment']} only)" if record.get("fragment") else ""
+    with st.expander(f"Rerun timings{scope}: {record['total'] * 1e3:.1f} ms", expanded=False):
+        st.table({
+            "stage": list(record["stages"]),
+            "ms": [round(seconds * 1e3, 2) for seconds in record["stages"].values()],
+        })
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(path=LOG_PATH):
+    """Return {(app, stage): [seconds, ...]} from a timings log.
+
+    Fragment-only reruns are reported as ``app:fragment``.
+    """
+    samples = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            app = record["app"]
+            if record.get("fragment"):
+                app = f"{app}:{record['fragment']}"
+            samples[(app, "total")].append(record["total"])
+            for name, seconds in record["stages"].items():
+                samples[(app, name)].append(seconds)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p99 per app and stage from a timings log.")
+    parser.add_argument("path", nargs="?", default=LOG_PATH)
+    args = parser.parse_args()
+
+    print(f"{'app':<24} {'stage':<16} {'runs':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for (app, name), values in sorted(summarize(args.path).items()):
+        print(f"{app:<24} {name:<16} {len(values):>6} "
+              f"{percentile(values, 0.5) * 1e3:>9.2f} {percentile(values, 0.99) * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
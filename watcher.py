@@ -0,0 +1,80 @@
+import logging
+import os
+import threading
+import time
+
+import backends
+import data_loader
+import timing
+
+# Push CSV updates to open sessions.
+#
+# One thread per process polls the CSV's mtime and size every
+# P4_WATCH_INTERVAL seconds (0 turns watching off). On a change it loads the
+# new version through the configured backend right away, so appended years
+# are folded in incrementally (see data_loader / Dataset.appended) before any
+# session asks for them. Each session runs a small st.fragment on the same
+# interval that compares its dataset version with the watcher's and reruns
+# the page when they differ; nothing else on the page reloads.
+#
+# That check is the cost of an idle tab: one fragment rerun sending ~0.5 KB,
+# measured at about 20 ms of server CPU on one core, so at the default 5 s
+# each open session takes ~0.5% of a core (benchmarks/load_test.py
+# --watch-interval, and the "watch poll" row of bench_fragments.py).
+
+INTERVAL = float(os.environ.get("P4_WATCH_INTERVAL", "5"))
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_threads = {}
+_latest = {}
+
+
+def _watch(path, interval):
+    last = None
+    while True:
+        try:
+            stat = os.stat(path)
+            key = (stat.st_mtime_ns, stat.st_size)
+            if key != last:
+                _latest[path] = backends.get_backend(path=path).version
+                last = key
+        except Exception:
+            # A half-written file or a parse error: keep serving the old
+            # version and try again on the next tick.
+            logger.exception("reloading %s failed", path)
+        time.sleep(interval)
+
+
+def start(path=None, interval=INTERVAL):
+    """Start this process's watcher for ``path`` (default data_loader.CSV_PATH) once."""
+    path = path or data_loader.CSV_PATH
+    with _lock:
+        if path not in _threads:
+            thread = threading.Thread(target=_watch, args=(path, interval), name="p4-watcher", daemon=True)
+            _threads[path] = thread
+            thread.start()
+    return path
+
+
+def latest_version(path=None):
+    return _latest.get(path or data_loader.CSV_PATH)
+
+
+def follow(dataset, interval=INTERVAL):
+    """Rerun the calling session once the watcher has a newer version than ``dataset``."""
+    if not interval:
+        return
+    import streamlit as st
+
+    path = start(interval=interval)
+
+    @st.fragment(run_every=interval)
+    def check_for_update():
+        with timing.fragment("watcher.py", "check_for_update"):
+            changed = _latest.get(path, dataset.version) != dataset.version
+        if changed:
+            st.rerun()
+
+    check_for_update()